@@ -0,0 +1,177 @@
+"""
+Approximate Nearest-Neighbour Index for Brisbane Business Bridge AI
+Pure numpy IVF (inverted file) index over unit-length delegate vectors
+"""
+
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from matching import top_k_indices
+
+DEFAULT_NPROBE = 8
+KMEANS_ITERATIONS = 10
+KMEANS_MAX_TRAINING_VECTORS = 50000
+ASSIGN_CHUNK_SIZE = 8192
+
+
+def default_list_count(n_vectors):
+    """Number of inverted lists for an index of n_vectors (about 4 * sqrt(n))"""
+    return max(1, min(n_vectors, int(round(4 * math.sqrt(n_vectors)))))
+
+
+class IVFIndex:
+    """
+    Inverted-file index for inner-product search over normalized vectors
+
+    Vectors are clustered around n_lists k-means centroids. A query is only
+    compared with the vectors in its nprobe closest lists, so nprobe is the
+    recall-vs-latency knob: nprobe == n_lists is an exact search. New vectors
+    can be added at any time and are assigned to the existing centroids.
+    """
+
+    def __init__(self, dimension, nprobe=DEFAULT_NPROBE):
+        self.dimension = dimension
+        self.nprobe = nprobe
+        self.centroids = None
+        self.vectors = np.empty((0, dimension), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.assignments = np.empty(0, dtype=np.int32)
+        self._list_rows = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    @property
+    def n_lists(self):
+        return 0 if self.centroids is None else len(self.centroids)
+
+    def _assign(self, vectors, centroids):
+        """Return the closest centroid for each vector, in bounded-size chunks"""
+        assignments = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), ASSIGN_CHUNK_SIZE):
+            chunk = vectors[start:start + ASSIGN_CHUNK_SIZE]
+            assignments[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignments
+
+    def train(self, vectors, n_lists=None, seed=0):
+        """Learn list centroids with spherical k-means"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) == 0:
+            raise ValueError("Cannot train an IVF index on zero vectors")
+
+        rng = np.random.default_rng(seed)
+        if len(vectors) > KMEANS_MAX_TRAINING_VECTORS:
+            vectors = vectors[rng.choice(len(vectors), KMEANS_MAX_TRAINING_VECTORS, replace=False)]
+
+        n_lists = min(n_lists or default_list_count(len(vectors)), len(vectors))
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assignments = self._assign(vectors, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            counts = np.bincount(assignments, minlength=n_lists)
+
+            # Reseed empty lists with random vectors
+            empty = counts == 0
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+
+        self.centroids = centroids.astype(np.float32)
+
+        # Re-bucket anything already in the index
+        if len(self.vectors):
+            self.assignments = self._assign(self.vectors, self.centroids)
+        self._rebuild_lists()
+
+    def _rebuild_lists(self):
+        order = np.argsort(self.assignments, kind='stable')
+        bounds = np.searchsorted(self.assignments[order], np.arange(self.n_lists + 1))
+        self._list_rows = [order[bounds[i]:bounds[i + 1]] for i in range(self.n_lists)]
+
+    def add(self, vectors, ids):
+        """Insert vectors with their integer ids"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(vectors) != len(ids):
+            raise ValueError("vectors and ids must have the same length")
+
+        first_row = len(self.ids)
+        self.vectors = np.vstack([self.vectors, vectors])
+        self.ids = np.concatenate([self.ids, ids])
+
+        if not self.is_trained:
+            return
+
+        new_assignments = self._assign(vectors, self.centroids)
+        self.assignments = np.concatenate([self.assignments, new_assignments])
+        new_rows = np.arange(first_row, first_row + len(vectors))
+        for list_id in np.unique(new_assignments):
+            rows = new_rows[new_assignments == list_id]
+            self._list_rows[list_id] = np.concatenate([self._list_rows[list_id], rows])
+
+    def search(self, query, k, nprobe=None):
+        """
+        Return (ids, similarities) of the approximate k nearest vectors
+
+        Untrained indexes fall back to an exact search over every vector.
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(self.dimension)
+
+        if self.is_trained:
+            nprobe = min(nprobe or self.nprobe, self.n_lists)
+            probes = top_k_indices(self.centroids @ query, nprobe)
+            rows = np.concatenate([self._list_rows[p] for p in probes])
+        else:
+            rows = np.arange(len(self.ids))
+
+        similarities = self.vectors[rows] @ query
+        best = top_k_indices(similarities, k)
+        return self.ids[rows[best]], similarities[best]
+
+    def save(self, path, metadata=None):
+        """Atomically write the index (and optional JSON metadata) to an .npz file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    dimension=self.dimension,
+                    nprobe=self.nprobe,
+                    centroids=self.centroids if self.is_trained else np.empty((0, self.dimension), dtype=np.float32),
+                    vectors=self.vectors,
+                    ids=self.ids,
+                    assignments=self.assignments,
+                    metadata=json.dumps(metadata or {})
+                )
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save(); returns (index, metadata)"""
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(int(data['dimension']), nprobe=int(data['nprobe']))
+            index.vectors = data['vectors']
+            index.ids = data['ids']
+            if len(data['centroids']):
+                index.centroids = data['centroids']
+                index.assignments = data['assignments']
+                index._rebuild_lists()
+            metadata = json.loads(str(data['metadata']))
+        return index, metadata
@@ -3,42 +3,139 @@ Brisbane Business Bridge AI - Main Flask Application
 AI-powered delegate matching for Brisbane City Council events
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, url_for
+from flask import Flask, render_template, request, jsonify, send_file, url_for, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import os
+import re
 import json
+import hashlib
+import hmac
+import inspect
+import time
 from datetime import datetime
 from pathlib import Path
-import PyPDF2
-import docx
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
 import google.generativeai as genai
 from notion_client import Client
+from llm_client import LLMClient, LLMUnavailable
+from match_history import MatchHistory, GROUP_COLUMNS
+from notion_queue import NotionWriteQueue
 from pdf_generator import generate_match_report_pdf
+from extraction import (
+    extract_document, SUPPORTED_EXTENSIONS,
+    ExtractionPool, ExtractionError, ExtractionTimeout, ExtractionPoolBusy
+)
+from matching import DelegateIndex, BUSINESS_TYPE_KEYWORDS
+from embeddings import EmbeddingMatcher, sentence_transformers_available
+from delegate_store import DelegateStore, EventShard, partition_by_event
+from retention import RetentionSweeper, TEMP_SUFFIX
+from result_cache import ResultCache, cache_key, content_hash, normalize_profile_text
 
 # Load environment variables
 load_dotenv()
 
 # Configure Google Gemini
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
+GEMINI_MODEL_NAME = 'gemini-pro'
+# GEMINI_API_ENDPOINT / NOTION_BASE_URL point the clients at other servers,
+# e.g. the local stand-ins in mock_services.py for load testing
+GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT')
 if GOOGLE_API_KEY:
-    genai.configure(api_key=GOOGLE_API_KEY)
-    gemini_model = genai.GenerativeModel('gemini-pro')
+    if GEMINI_API_ENDPOINT:
+        genai.configure(api_key=GOOGLE_API_KEY, transport='rest',
+                        client_options={'api_endpoint': GEMINI_API_ENDPOINT})
+        print(f"[OK] Using Gemini endpoint {GEMINI_API_ENDPOINT}")
+    else:
+        genai.configure(api_key=GOOGLE_API_KEY)
+    gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
     print("[OK] Google Gemini API configured")
 else:
     gemini_model = None
     print("[WARNING] Google API key not found - using simple analysis")
 
+# Every Gemini call goes through a rate limiter (GEMINI_RATE_PER_MINUTE, bursts
+# of GEMINI_BURST) and a circuit breaker that opens after GEMINI_BREAKER_FAILURES
+# consecutive failures; while it is open, analyses use the fallback text at once
+gemini_client = LLMClient(
+    rate_per_second=float(os.getenv('GEMINI_RATE_PER_MINUTE', 60)) / 60,
+    burst=int(os.getenv('GEMINI_BURST', 10)),
+    max_wait=float(os.getenv('GEMINI_RATE_WAIT_SECONDS', 2)),
+    failure_threshold=int(os.getenv('GEMINI_BREAKER_FAILURES', 5)),
+    reset_timeout=float(os.getenv('GEMINI_BREAKER_RESET_SECONDS', 30))
+)
+
+# Synergy analyses for a request's matches are generated concurrently. Each
+# Gemini call gets SYNERGY_TIMEOUT_SECONDS and the whole set SYNERGY_BUDGET_SECONDS;
+# an analysis that misses its deadline falls back to the template text
+SYNERGY_TIMEOUT_SECONDS = float(os.getenv('SYNERGY_TIMEOUT_SECONDS', 8))
+SYNERGY_BUDGET_SECONDS = float(os.getenv('SYNERGY_BUDGET_SECONDS', 12))
+synergy_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('SYNERGY_WORKERS', 8)),
+    thread_name_prefix='synergy'
+)
+
 # Configure Notion
 NOTION_TOKEN = os.getenv('NOTION_TOKEN')
 NOTION_DATABASE_ID = os.getenv('NOTION_DATABASE_ID')
+NOTION_BASE_URL = os.getenv('NOTION_BASE_URL')
 if NOTION_TOKEN and NOTION_DATABASE_ID:
-    notion = Client(auth=NOTION_TOKEN)
+    notion_options = {'auth': NOTION_TOKEN, 'base_url': NOTION_BASE_URL} if NOTION_BASE_URL else {'auth': NOTION_TOKEN}
+    try:
+        # The write queue owns retries and 429 pacing; newer notion-client releases would retry on their own
+        notion = Client(retry=False, **notion_options)
+    except TypeError:
+        notion = Client(**notion_options)
     print("[OK] Notion integration configured")
 else:
     notion = None
     print("[WARNING] Notion credentials not found - matches won't be saved")
 
+
+# Optional rich-text property of the Notion database that stores each match's
+# idempotency key. When set, a write that may have reached Notion before failing
+# is looked up by that key before it is resent (needs a notion-client with
+# databases.query); when unset, such a write is resent and may appear twice.
+NOTION_KEY_PROPERTY = os.getenv('NOTION_KEY_PROPERTY', '').strip() or None
+
+
+def notion_page_exists(page):
+    """
+    True if the database already has a page with this match's idempotency key
+
+    Pages spooled before NOTION_KEY_PROPERTY was set carry no key; they are
+    reported as missing so the write is resent rather than dropped.
+    """
+    key_text = page['properties'].get(NOTION_KEY_PROPERTY, {}).get('rich_text')
+    if not key_text:
+        return False
+    key = key_text[0]['text']['content']
+    response = notion.databases.query(
+        database_id=NOTION_DATABASE_ID,
+        filter={"property": NOTION_KEY_PROPERTY, "rich_text": {"equals": key}},
+        page_size=1
+    )
+    return bool(response.get('results'))
+
+
+# Matches are written to Notion in the background from a durable SQLite spool,
+# so uploads never wait on Notion and queued writes survive restarts. Notion
+# allows ~3 requests/second per integration; the spool paces all workers together.
+if notion:
+    NOTION_QUEUE = NotionWriteQueue(
+        Path(__file__).parent / "data" / "spool" / "notion.sqlite3",
+        writer=lambda page: notion.pages.create(**page),
+        max_attempts=int(os.getenv('NOTION_MAX_ATTEMPTS', 8)),
+        rate_per_second=float(os.getenv('NOTION_RATE_PER_SECOND', 2.5)),
+        batch_size=int(os.getenv('NOTION_BATCH_SIZE', 10)),
+        already_written=(
+            notion_page_exists if NOTION_KEY_PROPERTY and hasattr(notion.databases, 'query') else None
+        )
+    )
+    NOTION_QUEUE.start()
+else:
+    NOTION_QUEUE = None
+
 # Initialize Flask app
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
@@ -48,40 +145,239 @@ app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-# Load delegates data
-DELEGATES_PATH = Path(__file__).parent / "data" / "delegates.json"
-with open(DELEGATES_PATH, 'r', encoding='utf-8') as f:
-    DELEGATES = json.load(f)
+# Uploaded CVs and *_results.json files are removed after UPLOAD_RETENTION_HOURS,
+# and oldest first whenever the folder grows past UPLOAD_QUOTA_MB
+UPLOAD_RETENTION = RetentionSweeper(
+    app.config['UPLOAD_FOLDER'],
+    max_age_seconds=float(os.getenv('UPLOAD_RETENTION_HOURS', 72)) * 3600,
+    max_bytes=int(float(os.getenv('UPLOAD_QUOTA_MB', 500)) * 1024 * 1024),
+    interval=float(os.getenv('UPLOAD_SWEEP_MINUTES', 10)) * 60
+)
+UPLOAD_RETENTION.start()
+
+# Only the start of a document is used for matching, so extraction stops once
+# PROFILE_TEXT_CHARS have been collected or MAX_EXTRACT_PAGES have been read
+PROFILE_TEXT_CHARS = 2000
+MAX_EXTRACT_PAGES = int(os.getenv('MAX_EXTRACT_PAGES', 50))
+
+# Documents are parsed in a bounded pool of worker processes with per-document
+# time and memory limits, so a hostile PDF cannot stall the web worker.
+# EXTRACT_WORKERS=0 extracts inline instead (e.g. where subprocesses are unavailable)
+EXTRACT_WORKERS = int(os.getenv('EXTRACT_WORKERS', 2))
+if EXTRACT_WORKERS > 0:
+    EXTRACTION_POOL = ExtractionPool(
+        max_workers=EXTRACT_WORKERS,
+        timeout=float(os.getenv('EXTRACT_TIMEOUT_SECONDS', 10)),
+        memory_limit_mb=int(os.getenv('EXTRACT_MEMORY_MB', 512)),
+        queue_timeout=float(os.getenv('EXTRACT_QUEUE_TIMEOUT_SECONDS', 5))
+    )
+else:
+    EXTRACTION_POOL = None
+
+# Uploads are extracted in memory; keeping the original file is optional and
+# happens on a background thread so it never delays the response
+SAVE_UPLOADS = os.getenv('SAVE_UPLOADS', 'true').strip().lower() in ('1', 'true', 'yes')
+upload_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='upload-writer')
+
+# Repeat uploads of the same CV reuse the extracted text and match list from
+# a persistent cache shared by all workers
+CACHE_RESULTS = os.getenv('CACHE_RESULTS', 'true').strip().lower() in ('1', 'true', 'yes')
+if CACHE_RESULTS:
+    RESULT_CACHE = ResultCache(
+        Path(__file__).parent / "data" / "cache" / "results.sqlite3",
+        max_entries=int(os.getenv('RESULT_CACHE_MAX_ENTRIES', 5000)),
+        ttl_seconds=float(os.getenv('RESULT_CACHE_TTL_HOURS', 168)) * 3600,
+        namespaces=('extraction', 'matches')
+    )
+else:
+    RESULT_CACHE = None
+
+# Gemini synergy analyses are cached separately (they are the expensive part)
+# by profile fingerprint, delegate content hash and prompt version
+SYNERGY_CACHE_ENABLED = os.getenv('SYNERGY_CACHE', 'true').strip().lower() in ('1', 'true', 'yes')
+if SYNERGY_CACHE_ENABLED:
+    SYNERGY_CACHE = ResultCache(
+        Path(__file__).parent / "data" / "cache" / "synergy.sqlite3",
+        max_entries=int(os.getenv('SYNERGY_CACHE_MAX_ENTRIES', 20000)),
+        ttl_seconds=float(os.getenv('SYNERGY_CACHE_TTL_DAYS', 30)) * 86400,
+        namespaces=('synergy',)
+    )
+else:
+    SYNERGY_CACHE = None
+
+# Configure matching mode: 'keyword' (default) or 'embedding'
+MATCH_MODES = ('keyword', 'embedding')
+MATCH_MODE = os.getenv('MATCH_MODE', 'keyword').strip().lower()
+if MATCH_MODE not in MATCH_MODES:
+    print(f"[WARNING] Unknown MATCH_MODE '{MATCH_MODE}' - using keyword matching")
+    MATCH_MODE = 'keyword'
+
+# Batch matching limits for /api/match/batch
+MAX_BATCH_PROFILES = int(os.getenv('MAX_BATCH_PROFILES', 5000))
+MAX_BATCH_TOP_K = 50
+
+# Delegates are sharded by event; delegates without an event attend DEFAULT_EVENT
+DEFAULT_EVENT = os.getenv('DEFAULT_EVENT', 'Boldly Brisbane Forum 2025')
+
+# Delegate embeddings are cached on disk by content hash, one cache per event,
+# and shared across workers
+EMBEDDINGS_DIR = Path(__file__).parent / "data" / "embeddings"
+EMBEDDINGS_AVAILABLE = sentence_transformers_available()
+if MATCH_MODE == 'embedding' and not EMBEDDINGS_AVAILABLE:
+    print("[WARNING] sentence-transformers not installed - using keyword matching")
+
+
+def event_slug(event):
+    """Filesystem-safe name for an event"""
+    return re.sub(r'[^a-z0-9]+', '_', event.lower()).strip('_') or 'event'
+
+
+def build_event_shard(event, delegates):
+    """Build the matching indexes for one event's delegates"""
+    # Precompile delegate keywords once so each request only scans the profile once.
+    # MATCH_BOUNDARY controls phrase matching: substring (default), prefix or word
+    indexes = {
+        'keyword_index': DelegateIndex(delegates, boundary=os.getenv('MATCH_BOUNDARY', 'substring')),
+        'embedding_matcher': None
+    }
 
-print(f"[LOADED] {len(DELEGATES)} Brisbane delegates from knowledge base")
+    if RESULT_CACHE:
+        # Hash the delegates now so cache lookups never pay for it
+        delegates.fingerprint()
+
+    if EMBEDDINGS_AVAILABLE:
+        slug = event_slug(event)
+        indexes['embedding_matcher'] = EmbeddingMatcher(
+            delegates,
+            cache_path=EMBEDDINGS_DIR / f"{slug}.pkl",
+            model_name=os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2'),
+            ann_path=EMBEDDINGS_DIR / f"{slug}_ann.npz",
+            ann_min_delegates=int(os.getenv('ANN_MIN_DELEGATES', 5000)),
+            nprobe=int(os.getenv('ANN_NPROBE', 8))
+        )
+        if MATCH_MODE == 'embedding':
+            # Encode before the snapshot goes live so requests never wait on it
+            indexes['embedding_matcher'].load()
+
+    return EventShard(event, delegates, **indexes)
+
+
+def build_delegate_indexes(delegates):
+    """Partition a DelegateTable by event and build an index shard per event"""
+    partitions = partition_by_event(delegates, DEFAULT_EVENT)
+    return {
+        'shards': {
+            event: build_event_shard(event, delegates.take(rows))
+            for event, rows in partitions.items()
+        }
+    }
+
+
+# Load delegates data. The store rebuilds indexes in the background when
+# delegates.json changes and swaps the new snapshot in atomically.
+DELEGATES_PATH = Path(__file__).parent / "data" / "delegates.json"
+DELEGATE_STORE = DelegateStore(
+    DELEGATES_PATH,
+    build_indexes=build_delegate_indexes,
+    poll_interval=float(os.getenv('DELEGATES_POLL_SECONDS', 5))
+)
+DELEGATE_STORE.start_watching()
+
+print(f"[LOADED] {len(DELEGATE_STORE.current())} Brisbane delegates from knowledge base")
+for _shard in DELEGATE_STORE.current().shards.values():
+    print(f"  {_shard.event}: {len(_shard)} delegates")
+if MATCH_MODE == 'embedding' and EMBEDDINGS_AVAILABLE:
+    print("[OK] Semantic embedding matching enabled")
+
+# Shared secret for admin endpoints such as /api/delegates/reload; without it
+# those endpoints are disabled
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+
+def admin_denied():
+    """Error response unless the request carries ADMIN_TOKEN in X-Admin-Token, else None"""
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'error': 'Unauthorized'}), 401
+    return None
+
+# Every match is recorded in a local SQLite store that answers history queries
+# (/api/matches); Notion receives a copy through NOTION_QUEUE
+MATCH_HISTORY = MatchHistory(
+    os.getenv('MATCH_HISTORY_PATH') or Path(__file__).parent / "data" / "history" / "matches.sqlite3"
+)
 
 
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
 
-def extract_text_from_pdf(file_path):
-    """Extract text content from PDF file"""
-    text = ""
-    try:
-        with open(file_path, 'rb') as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-    except Exception as e:
-        print(f"[ERROR] PDF extraction failed: {e}")
-    return text
+def write_upload_file(filename, data):
+    """
+    Write a file into the upload folder atomically
+
+    Data goes to a temp file first, so an interrupted write leaves only a
+    temp file that the retention sweeper removes at startup.
+    """
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    temp_path = filepath + TEMP_SUFFIX
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, filepath)
+    UPLOAD_RETENTION.note_written(len(data))
 
 
-def extract_text_from_docx(file_path):
-    """Extract text content from DOCX file"""
-    text = ""
+def persist_upload(data, safe_filename):
+    """Write the original uploaded file to the upload folder"""
     try:
-        doc = docx.Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs])
+        write_upload_file(safe_filename, data)
+        print(f"[UPLOAD] File saved: {safe_filename}")
     except Exception as e:
-        print(f"[ERROR] DOCX extraction failed: {e}")
-    return text
+        print(f"[ERROR] Saving upload {safe_filename} failed: {e}")
+
+
+def extract_upload(file_bytes, filename):
+    """
+    Extract profile text from uploaded bytes, reusing the cached result for
+    a file that was uploaded before
+
+    Raises ExtractionError (and its subclasses) from the extraction pool
+    """
+    cache_id = None
+    if RESULT_CACHE:
+        cache_id = cache_key(content_hash(file_bytes), Path(filename).suffix.lower(),
+                             PROFILE_TEXT_CHARS, MAX_EXTRACT_PAGES)
+        cached = RESULT_CACHE.get('extraction', cache_id)
+        if cached is not None:
+            print("[CACHE] Reusing extracted text for a previously uploaded file")
+            return cached
+
+    if EXTRACTION_POOL:
+        extraction = EXTRACTION_POOL.extract(
+            file_bytes, filename, max_chars=PROFILE_TEXT_CHARS, max_pages=MAX_EXTRACT_PAGES
+        )
+    else:
+        extraction = extract_document(
+            file_bytes, filename, max_chars=PROFILE_TEXT_CHARS, max_pages=MAX_EXTRACT_PAGES
+        )
+
+    if cache_id and extraction is not None:
+        RESULT_CACHE.set('extraction', cache_id, extraction)
+    return extraction
+
+
+def build_user_profile(user_info, extracted_text):
+    """Combine all user information into the profile text used for matching"""
+    return f"""
+Name: {user_info.get('name', '')}
+Company: {user_info.get('company', '')}
+Email: {user_info.get('email', '')}
+Industry: {user_info.get('industry', '')}
+
+Profile Content:
+{extracted_text[:PROFILE_TEXT_CHARS]}  # Limit to first 2000 chars for performance
+"""
 
 
 def simple_text_matching(user_text, delegate):
@@ -107,133 +403,216 @@ def simple_text_matching(user_text, delegate):
     score += min(matching_keywords * 5, 40)
 
     # Business type bonus
-    business_types = {
-        'investor': ['invest', 'capital', 'fund', 'equity'],
-        'funding seeker': ['seeking', 'funding', 'investment', 'capital'],
-        'service provider': ['service', 'consulting', 'consulting', 'advisory'],
-        'exporter': ['export', 'international', 'overseas']
-    }
-
-    if delegate['business_type'].lower() in business_types:
-        keywords = business_types[delegate['business_type'].lower()]
+    if delegate['business_type'].lower() in BUSINESS_TYPE_KEYWORDS:
+        keywords = BUSINESS_TYPE_KEYWORDS[delegate['business_type'].lower()]
         if any(kw in user_text_lower for kw in keywords):
             score += 20
 
     return min(score, 100)  # Cap at 100%
 
 
-def match_delegates(user_profile_text, user_info):
+def get_event_shard(event=None, snapshot=None):
     """
-    Match user profile against all delegates and return top 3
+    Return the delegate shard for an event (defaults to DEFAULT_EVENT)
+
+    Raises KeyError if no delegates are registered for the event
     """
-    print(f"[MATCHING] Analyzing profile for: {user_info.get('name', 'Unknown')}")
+    snapshot = snapshot or DELEGATE_STORE.current()
+    event = event or DEFAULT_EVENT
+    if event not in snapshot.shards:
+        raise KeyError(event)
+    return snapshot.shards[event]
 
-    # Calculate scores for all delegates
-    matches = []
-    for delegate in DELEGATES:
-        score = simple_text_matching(user_profile_text, delegate)
-        matches.append({
-            'delegate': delegate,
-            'score': score
-        })
 
-    # Sort by score (descending) and get top 3
-    matches.sort(key=lambda x: x['score'], reverse=True)
-    top_3 = matches[:3]
+def match_delegates(user_profile_text, user_info, mode=None, snapshot=None, event=None):
+    """
+    Match user profile against an event's delegates and return top 3
+
+    mode selects 'keyword' or 'embedding' matching (defaults to MATCH_MODE);
+    snapshot defaults to the live delegate snapshot and event to DEFAULT_EVENT
+    """
+    print(f"[MATCHING] Analyzing profile for: {user_info.get('name', 'Unknown')}")
+    mode = mode or MATCH_MODE
+    shard = get_event_shard(event, snapshot)
+
+    # Same profile, same delegates and same matcher settings give the same matches.
+    # The profile is keyed exactly as scored: phrase matching sees its spacing
+    cache_id = None
+    if RESULT_CACHE:
+        cache_id = cache_key(
+            user_profile_text, mode, shard.event, shard.delegates.fingerprint(),
+            shard.keyword_index.boundary, os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+        )
+        cached = RESULT_CACHE.get('matches', cache_id)
+        if cached is not None:
+            print("[CACHE] Reusing top 3 matches for an identical profile")
+            return cached
+
+    matcher = None
+    ranked = None
+    if mode == 'embedding' and shard.embedding_matcher is not None:
+        try:
+            matcher = shard.embedding_matcher
+            ranked = matcher.top_k(user_profile_text, k=3)
+        except Exception as e:
+            print(f"[WARNING] Embedding matching failed: {e}. Using keyword matching.")
+            # Don't cache keyword results under the embedding key
+            cache_id = None
+
+    if ranked is None:
+        # Score all delegates in one batched operation and select the top 3
+        matcher = shard.keyword_index
+        ranked = matcher.top_k(user_profile_text, k=3)
+
+    top_3 = [
+        {
+            'delegate': matcher.delegates[i],
+            'score': score
+        }
+        for i, score in ranked
+    ]
 
     print(f"[RESULTS] Top 3 matches found:")
     for i, match in enumerate(top_3, 1):
         print(f"  {i}. {match['delegate']['name']} ({match['delegate']['company']}) - {match['score']}%")
 
+    if cache_id:
+        RESULT_CACHE.set('matches', cache_id, top_3)
     return top_3
 
 
-def store_match_in_notion(user_info, match, rank):
+def match_delegates_batch(profile_texts, k=3, mode=None, snapshot=None, event=None):
+    """
+    Match many profiles at once, scoring them as a matrix against an event's delegates
+
+    Yields the top k matches for each profile, in input order, as lists of
+    {'delegate', 'score'} dicts like match_delegates()
+    """
+    mode = mode or MATCH_MODE
+    shard = get_event_shard(event, snapshot)
+
+    matcher = shard.keyword_index
+    if mode == 'embedding' and shard.embedding_matcher is not None:
+        try:
+            shard.embedding_matcher.load()
+            matcher = shard.embedding_matcher
+        except Exception as e:
+            print(f"[WARNING] Embedding matching failed: {e}. Using keyword matching.")
+
+    print(f"[MATCHING] Batch matching {len(profile_texts)} profiles for {shard.event} ({mode})")
+
+    for ranked in matcher.top_k_batch(profile_texts, k=k):
+        yield [
+            {
+                'delegate': matcher.delegates[i],
+                'score': score
+            }
+            for i, score in ranked
+        ]
+
+
+def build_notion_page(user_info, match, rank, event=None, key=None):
+    """Notion pages.create arguments for one match (key fills NOTION_KEY_PROPERTY if configured)"""
+    page = {
+        'parent': {"database_id": NOTION_DATABASE_ID},
+        'properties': {
+            "Name": {
+                "title": [{
+                    "text": {
+                        "content": f"{user_info['name']} ↔ {match['delegate']['name']}"
+                    }
+                }]
+            },
+            "User": {
+                "rich_text": [{
+                    "text": {"content": user_info['name']}
+                }]
+            },
+            "User Company": {
+                "rich_text": [{
+                    "text": {"content": user_info['company']}
+                }]
+            },
+            "User Email": {
+                "email": user_info['email']
+            },
+            "Delegate": {
+                "rich_text": [{
+                    "text": {"content": match['delegate']['name']}
+                }]
+            },
+            "Delegate Company": {
+                "rich_text": [{
+                    "text": {"content": match['delegate']['company']}
+                }]
+            },
+            "Delegate Email": {
+                "email": match['delegate']['email']
+            },
+            "Match Score": {
+                "number": match['score']
+            },
+            "Rank": {
+                "number": rank
+            },
+            "Sector": {
+                "select": {"name": match['delegate']['sector']}
+            },
+            "Event": {
+                "select": {"name": event or DEFAULT_EVENT}
+            },
+            "Status": {
+                "select": {"name": "New Match"}
+            }
+        }
+    }
+    if NOTION_KEY_PROPERTY and key:
+        page['properties'][NOTION_KEY_PROPERTY] = {
+            "rich_text": [{
+                "text": {"content": key}
+            }]
+        }
+    return page
+
+
+def match_idempotency_key(user_info, delegate, event, profile_hash):
+    """Deterministic key for one user-delegate match, so re-uploads and replays write it once"""
+    return cache_key(
+        'notion-match',
+        user_info['email'].strip().lower() or user_info['name'].strip().lower(),
+        delegate['name'], delegate['company'],
+        event or DEFAULT_EVENT,
+        profile_hash
+    )
+
+
+def store_match_in_notion(user_info, match, rank, event=None, profile_hash=None):
     """
-    Store a match in Notion database
+    Queue a match for storage in the Notion database
+
+    Returns True once the write is durably spooled (or was already stored);
+    it is sent in the background
     """
-    if not notion or not NOTION_DATABASE_ID:
+    if not NOTION_QUEUE or not NOTION_DATABASE_ID:
         return False
 
     try:
-        notion.pages.create(
-            parent={"database_id": NOTION_DATABASE_ID},
-            properties={
-                "Name": {
-                    "title": [{
-                        "text": {
-                            "content": f"{user_info['name']} ↔ {match['delegate']['name']}"
-                        }
-                    }]
-                },
-                "User": {
-                    "rich_text": [{
-                        "text": {"content": user_info['name']}
-                    }]
-                },
-                "User Company": {
-                    "rich_text": [{
-                        "text": {"content": user_info['company']}
-                    }]
-                },
-                "User Email": {
-                    "email": user_info['email']
-                },
-                "Delegate": {
-                    "rich_text": [{
-                        "text": {"content": match['delegate']['name']}
-                    }]
-                },
-                "Delegate Company": {
-                    "rich_text": [{
-                        "text": {"content": match['delegate']['company']}
-                    }]
-                },
-                "Delegate Email": {
-                    "email": match['delegate']['email']
-                },
-                "Match Score": {
-                    "number": match['score']
-                },
-                "Rank": {
-                    "number": rank
-                },
-                "Sector": {
-                    "select": {"name": match['delegate']['sector']}
-                },
-                "Event": {
-                    "select": {"name": "Boldly Brisbane Forum 2025"}
-                },
-                "Status": {
-                    "select": {"name": "New Match"}
-                }
-            }
-        )
+        key = match_idempotency_key(user_info, match['delegate'], event, profile_hash)
+        NOTION_QUEUE.enqueue(build_notion_page(user_info, match, rank, event, key=key), key=key)
         return True
     except Exception as e:
-        print(f"[ERROR] Notion storage failed: {e}")
+        print(f"[ERROR] Queueing Notion write failed: {e}")
         return False
 
 
-def generate_synergy_analysis_simple(user_text, delegate):
-    """
-    Generate synergy analysis using Google Gemini AI
-    Falls back to simple analysis if API unavailable
-    """
-    if gemini_model:
-        try:
-            prompt = f"""You are an expert business matchmaker for Brisbane City Council's international networking events.
+# Editing either prompt changes SYNERGY_PROMPT_VERSION, which invalidates cached analyses
+SYNERGY_PROMPT_TEMPLATE = """You are an expert business matchmaker for Brisbane City Council's international networking events.
 
 USER PROFILE (First 800 chars):
-{user_text[:800]}
+{user_text}
 
 DELEGATE PROFILE:
-Name: {delegate['name']}
-Title: {delegate['title']}
-Company: {delegate['company']}
-Sector: {delegate['sector']}
-Objectives: {delegate['objectives']}
-Interested Sectors: {', '.join(delegate['interested_sectors'])}
+{delegate_profile}
 
 Analyze the synergy between this user and delegate. Provide:
 
@@ -251,14 +630,119 @@ Analyze the synergy between this user and delegate. Provide:
 
 Keep the response under 250 words, professional, and actionable. Use markdown formatting."""
 
-            response = gemini_model.generate_content(prompt)
-            analysis = response.text
+# One prompt covering every top match: the profile is sent once instead of k times
+SYNERGY_BATCH_PROMPT_TEMPLATE = """You are an expert business matchmaker for Brisbane City Council's international networking events.
+
+USER PROFILE (First 800 chars):
+{user_text}
+
+{delegate_profiles}
+
+For EACH delegate above, analyze the synergy between this user and that delegate. Each analysis must provide:
+
+**Alignment Areas:**
+- List 2-3 key areas where their sectors, objectives, or interests align
+
+**Collaboration Opportunities:**
+- Identify 2-3 specific ways they could work together
+
+**Recommended Talking Points:**
+- Suggest 3-4 concrete topics for their first meeting
+
+**Next Steps:**
+- Recommend immediate actions
+
+Keep each analysis under 250 words, professional, and actionable. Use markdown formatting inside each analysis.
+
+Respond with ONLY a JSON array with one object per delegate, in the same order, like:
+[{{"delegate": 1, "analysis": "..."}}, {{"delegate": 2, "analysis": "..."}}]"""
+
+SYNERGY_PROMPT_VERSION = hashlib.sha256(
+    f"{GEMINI_MODEL_NAME}\n{SYNERGY_PROMPT_TEMPLATE}\n{SYNERGY_BATCH_PROMPT_TEMPLATE}".encode('utf-8')
+).hexdigest()[:16]
+
+# Send one prompt for all of an upload's matches (falls back to one prompt per
+# delegate if the combined response cannot be parsed)
+SYNERGY_BATCH = os.getenv('SYNERGY_BATCH', 'true').strip().lower() in ('1', 'true', 'yes')
+
+# Delegate fields that appear in a generated analysis (prompt plus contact details)
+SYNERGY_DELEGATE_FIELDS = ('name', 'title', 'company', 'sector', 'objectives', 'interested_sectors', 'email', 'phone')
+
+
+def synergy_cache_key(user_text, delegate):
+    """
+    Cache key for a Gemini analysis: (profile fingerprint, delegate content
+    hash, prompt version)
+
+    The profile fingerprint covers only the first 800 characters the prompt
+    uses, and the delegate hash only the fields the analysis uses, so the
+    entry is invalidated exactly when the analysis could change.
+    """
+    profile_fingerprint = content_hash(normalize_profile_text(user_text[:800]).encode('utf-8'))
+    delegate_hash = cache_key(*(delegate.get(field) for field in SYNERGY_DELEGATE_FIELDS))
+    return cache_key(profile_fingerprint, delegate_hash, SYNERGY_PROMPT_VERSION)
+
+
+def format_delegate_profile(delegate):
+    """Delegate fields as they appear in the synergy prompts"""
+    return f"""Name: {delegate['name']}
+Title: {delegate['title']}
+Company: {delegate['company']}
+Sector: {delegate['sector']}
+Objectives: {delegate['objectives']}
+Interested Sectors: {', '.join(delegate['interested_sectors'])}"""
+
+
+def add_contact_information(analysis, delegate):
+    """Append the delegate's contact details to a generated analysis"""
+    return analysis + f"\n\n**Contact Information:**\nEmail: {delegate['email']}\nPhone: {delegate.get('phone', 'Contact via Brisbane City Council')}"
+
+
+# google-generativeai < 0.4 has no request_options and rejects it as an unknown
+# request field; there, the synergy executor's deadline bounds each analysis instead
+GEMINI_REQUEST_OPTIONS = 'request_options' in inspect.signature(genai.GenerativeModel.generate_content).parameters
+
+
+def call_gemini(prompt, timeout=None):
+    """
+    Send a prompt to Gemini through the rate limiter and circuit breaker
+
+    Returns the response text; raises LLMUnavailable without calling Gemini
+    when the breaker is open or the rate limit is exhausted
+    """
+    kwargs = {'request_options': {'timeout': timeout}} if timeout and GEMINI_REQUEST_OPTIONS else {}
+    return gemini_client.call(gemini_model.generate_content, prompt, **kwargs).text
+
+
+def generate_synergy_analysis_simple(user_text, delegate, timeout=None):
+    """
+    Generate synergy analysis using Google Gemini AI
+    Falls back to simple analysis if API unavailable
 
-            # Add contact information
-            analysis += f"\n\n**Contact Information:**\nEmail: {delegate['email']}\nPhone: {delegate.get('phone', 'Contact via Brisbane City Council')}"
+    timeout bounds the Gemini request in seconds where the client supports it (None = client default)
+    """
+    if gemini_model:
+        # Only Gemini analyses are cached; the fallback below is cheap to rebuild
+        cache_id = None
+        if SYNERGY_CACHE:
+            cache_id = synergy_cache_key(user_text, delegate)
+            cached = SYNERGY_CACHE.get('synergy', cache_id)
+            if cached is not None:
+                return cached
 
+        try:
+            prompt = SYNERGY_PROMPT_TEMPLATE.format(
+                user_text=user_text[:800],
+                delegate_profile=format_delegate_profile(delegate)
+            )
+            analysis = add_contact_information(call_gemini(prompt, timeout), delegate)
+
+            if cache_id:
+                SYNERGY_CACHE.set('synergy', cache_id, analysis)
             return analysis
 
+        except LLMUnavailable as e:
+            print(f"[WARNING] {e}. Using simple analysis.")
         except Exception as e:
             print(f"[WARNING] Gemini API error: {e}. Using simple analysis.")
 
@@ -282,6 +766,188 @@ Phone: {delegate.get('phone', 'Via Brisbane City Council')}
     return analysis
 
 
+def parse_batched_analyses(response_text, count):
+    """
+    Parse the JSON array returned for a batched synergy prompt
+
+    Returns the analyses in delegate order. Raises ValueError unless there
+    is exactly one non-empty analysis for each of the count delegates.
+    """
+    text = response_text.strip()
+    # Models often wrap JSON in a markdown code fence
+    fenced = re.match(r'^```(?:json)?\s*(.*?)\s*```$', text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+
+    items = json.loads(text)
+    if not isinstance(items, list) or len(items) != count:
+        raise ValueError(f'expected {count} analyses, got {len(items) if isinstance(items, list) else type(items).__name__}')
+
+    analyses = [None] * count
+    for position, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('analysis'), str) or not item['analysis'].strip():
+            raise ValueError(f'analysis {position + 1} is missing or empty')
+        number = item.get('delegate', position + 1)
+        if not isinstance(number, int) or not 1 <= number <= count or analyses[number - 1] is not None:
+            raise ValueError(f'analysis {position + 1} has an invalid delegate number')
+        analyses[number - 1] = item['analysis'].strip()
+    return analyses
+
+
+def generate_batched_synergy_analyses(user_text, delegates, timeout=None):
+    """
+    Generate the analyses for several delegates with a single Gemini prompt
+
+    Cached analyses are reused and only the rest are requested. Returns the
+    analyses in delegate order; raises if Gemini fails or its response
+    cannot be parsed, so the caller can fall back to one prompt per delegate.
+    """
+    analyses = [None] * len(delegates)
+    cache_ids = [None] * len(delegates)
+    if SYNERGY_CACHE:
+        for i, delegate in enumerate(delegates):
+            cache_ids[i] = synergy_cache_key(user_text, delegate)
+            analyses[i] = SYNERGY_CACHE.get('synergy', cache_ids[i])
+
+    missing = [i for i, analysis in enumerate(analyses) if analysis is None]
+    if not missing:
+        return analyses
+
+    prompt = SYNERGY_BATCH_PROMPT_TEMPLATE.format(
+        user_text=user_text[:800],
+        delegate_profiles="\n\n".join(
+            f"DELEGATE {number}:\n{format_delegate_profile(delegates[i])}"
+            for number, i in enumerate(missing, 1)
+        )
+    )
+    generated = parse_batched_analyses(call_gemini(prompt, timeout), len(missing))
+
+    for i, analysis in zip(missing, generated):
+        analyses[i] = add_contact_information(analysis, delegates[i])
+        if cache_ids[i]:
+            SYNERGY_CACHE.set('synergy', cache_ids[i], analyses[i])
+
+    print(f"[ANALYSIS] Generated {len(missing)} analyses with one batched prompt")
+    return analyses
+
+
+def template_synergy_analysis(delegate):
+    """Short template analysis used when a generated analysis fails or is too slow"""
+    return f"""**Alignment Areas:**
+- {delegate['sector']} sector alignment
+
+**Collaboration Opportunities:**
+{delegate['objectives'][:150]}...
+
+**Contact Information:**
+Email: {delegate['email']}
+Phone: {delegate.get('phone', 'Via Brisbane City Council')}
+"""
+
+
+def iter_synergy_analyses(user_text, matches, timeout=None, budget=None):
+    """
+    Generate the synergy analysis for every match concurrently
+
+    Yields (match index, analysis) as each one completes. With SYNERGY_BATCH
+    all analyses are first requested with one batched prompt; if that fails
+    or cannot be parsed, the remaining budget is spent on one concurrent
+    prompt per delegate. Each per-delegate Gemini request is limited to
+    timeout seconds, and all analyses must be ready within budget seconds of the call (which
+    also covers time spent waiting for a free thread). Any analysis that
+    misses the budget or fails gets template_synergy_analysis() instead, so
+    the slowest Gemini call never holds up the response.
+    """
+    timeout = SYNERGY_TIMEOUT_SECONDS if timeout is None else timeout
+    budget = SYNERGY_BUDGET_SECONDS if budget is None else budget
+    started = time.monotonic()
+    deadline = started + budget
+
+    if SYNERGY_BATCH and gemini_model and matches:
+        # One response carries every analysis, so it may use the whole budget
+        future = synergy_executor.submit(
+            generate_batched_synergy_analyses, user_text, [match['delegate'] for match in matches], budget
+        )
+        try:
+            analyses = future.result(timeout=budget)
+        except FutureTimeoutError:
+            if not future.cancel():
+                # Still waiting on Gemini: count the miss now, not when the call returns
+                gemini_client.record_timeout()
+            print(f"[WARNING] Batched analysis missed the {budget:g}s deadline - using template analyses")
+            for index, match in enumerate(matches):
+                yield index, template_synergy_analysis(match['delegate'])
+            return
+        except Exception as e:
+            print(f"[WARNING] Batched analysis failed ({e}) - generating analyses per delegate")
+        else:
+            for index, analysis in enumerate(analyses):
+                yield index, analysis
+            print(f"[ANALYSIS] {len(matches)} analyses in {time.monotonic() - started:.2f}s")
+            return
+
+    # When each call started running; queued calls have not used their timeout yet
+    call_started = {}
+
+    def analyse(index, delegate):
+        call_started[index] = time.monotonic()
+        return generate_synergy_analysis_simple(user_text, delegate, timeout)
+
+    def call_deadline(index, now):
+        # A call that has not started cannot expire before now + timeout
+        if not timeout:
+            return deadline
+        return min(call_started.get(index, now) + timeout, deadline)
+
+    futures = {
+        synergy_executor.submit(analyse, index, match['delegate']): index
+        for index, match in enumerate(matches)
+    }
+
+    pending = set(futures)
+    while pending:
+        now = time.monotonic()
+        wake = min(call_deadline(futures[future], now) for future in pending)
+        done, pending = wait(pending, timeout=max(0, wake - now), return_when=FIRST_COMPLETED)
+        for future in sorted(done, key=futures.get):
+            index = futures[future]
+            try:
+                analysis = future.result()
+                print(f"[OK] Analysis {index + 1} complete")
+            except Exception as e:
+                print(f"[ERROR] Analysis {index + 1} failed: {e}")
+                import traceback
+                traceback.print_exc()
+                analysis = template_synergy_analysis(matches[index]['delegate'])
+            yield index, analysis
+
+        # Give up on calls past their own timeout or the overall budget; the
+        # client may not enforce the timeout itself (google-generativeai < 0.4)
+        now = time.monotonic()
+        expired = sorted(
+            (future for future in pending if call_deadline(futures[future], now) <= now),
+            key=futures.get
+        )
+        for future in expired:
+            pending.discard(future)
+            if not future.cancel() and gemini_model:
+                gemini_client.record_timeout()
+            index = futures[future]
+            limit = 'overall' if now >= deadline else 'per-call'
+            print(f"[WARNING] Analysis {index + 1} missed the {limit} deadline - using template analysis")
+            yield index, template_synergy_analysis(matches[index]['delegate'])
+
+    print(f"[ANALYSIS] {len(matches)} analyses in {time.monotonic() - started:.2f}s")
+
+
+def generate_synergy_analyses(user_text, matches, timeout=None, budget=None):
+    """Generate every match's synergy analysis concurrently; returns them in match order"""
+    analyses = [None] * len(matches)
+    for index, analysis in iter_synergy_analyses(user_text, matches, timeout=timeout, budget=budget):
+        analyses[index] = analysis
+    return analyses
+
+
 # =============================================================================
 # ROUTES
 # =============================================================================
@@ -289,158 +955,311 @@ Phone: {delegate.get('phone', 'Via Brisbane City Council')}
 @app.route('/')
 def index():
     """Main landing page"""
-    return render_template('index.html', delegate_count=len(DELEGATES))
+    shards = DELEGATE_STORE.current().shards
+    default_shard = shards.get(DEFAULT_EVENT)
+    return render_template(
+        'index.html',
+        delegate_count=len(default_shard) if default_shard else len(DELEGATE_STORE.current()),
+        events=list(shards),
+        default_event=DEFAULT_EVENT
+    )
 
 
-@app.route('/upload', methods=['POST'])
-def upload_file():
-    """Handle file upload and matching"""
+def prepare_upload():
+    """
+    Validate the upload form and extract the document's text
+
+    Returns (upload, None) where upload holds everything the matching
+    pipeline needs, or (None, error_response) for a request to reject.
+    """
+    # Validate file upload
+    if 'file' not in request.files:
+        return None, (jsonify({'error': 'No file uploaded'}), 400)
+
+    file = request.files['file']
+    if file.filename == '':
+        return None, (jsonify({'error': 'No file selected'}), 400)
+
+    # Get form data
+    user_name = request.form.get('name', '').strip()
+    user_company = request.form.get('company', '').strip()
+    user_email = request.form.get('email', '').strip()
+    user_industry = request.form.get('industry', '').strip()
+    match_mode = request.form.get('match_mode', '').strip().lower() or None
+    event = request.form.get('event', '').strip() or DEFAULT_EVENT
+
+    if not user_name or not user_company:
+        return None, (jsonify({'error': 'Name and company are required'}), 400)
+
+    if match_mode and match_mode not in MATCH_MODES:
+        return None, (jsonify({'error': f"Unsupported match mode. Use one of: {', '.join(MATCH_MODES)}"}), 400)
+
+    snapshot = DELEGATE_STORE.current()
+    if event not in snapshot.shards:
+        return None, (jsonify({'error': f"Unknown event. Use one of: {', '.join(snapshot.shards)}"}), 400)
+
+    filename = secure_filename(file.filename)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    safe_filename = f"{timestamp}_{filename}"
+
+    if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        return None, (jsonify({'error': 'Unsupported file format. Please upload PDF or DOCX'}), 400)
+
+    # Extract text straight from the uploaded bytes (no temp file), reading
+    # only as many pages as the profile needs
+    file_bytes = file.read()
     try:
-        # Validate file upload
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file uploaded'}), 400
+        extraction = extract_upload(file_bytes, filename)
+    except ExtractionPoolBusy:
+        print("[WARNING] Extraction pool busy - rejecting upload")
+        return None, (jsonify({'error': 'The server is busy processing other documents. Please try again shortly.'}), 503)
+    except ExtractionTimeout as e:
+        print(f"[ERROR] Extraction timed out for {safe_filename}: {e}")
+        return None, (jsonify({'error': 'This file took too long to process. Please upload a smaller or simpler PDF or DOCX.'}), 400)
+    except ExtractionError as e:
+        print(f"[ERROR] Extraction failed for {safe_filename}: {e}")
+        return None, (jsonify({'error': 'Could not extract text from file. Please check the file format.'}), 400)
+
+    extracted_text = extraction['text']
+    if extraction['total_pages']:
+        print(f"[EXTRACT] Read {extraction['pages_read']}/{extraction['total_pages']} pages")
+
+    if not extracted_text or len(extracted_text) < 50:
+        return None, (jsonify({'error': 'Could not extract text from file. Please check the file format.'}), 400)
+
+    if SAVE_UPLOADS:
+        upload_writer.submit(persist_upload, file_bytes, safe_filename)
+
+    user_info = {
+        'name': user_name,
+        'company': user_company,
+        'email': user_email,
+        'industry': user_industry,
+        'event': event,
+        'uploaded_file': filename
+    }
 
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+    # Combine all user information for matching
+    profile = build_user_profile(user_info, extracted_text)
+
+    return {
+        'user_info': user_info,
+        'profile': profile,
+        'profile_hash': content_hash(normalize_profile_text(profile).encode('utf-8')),
+        'extraction': extraction,
+        'match_mode': match_mode,
+        'event': event,
+        'snapshot': snapshot,
+        'timestamp': timestamp
+    }, None
+
+
+def format_match(match, rank):
+    """Response representation of one match (synergy_analysis once generated)"""
+    delegate = match['delegate']
+    return {
+        'rank': rank,
+        'name': delegate['name'],
+        'title': delegate['title'],
+        'company': delegate['company'],
+        'sector': delegate['sector'],
+        'score': match['score'],
+        'email': delegate['email'],
+        'phone': delegate.get('phone', 'Contact via Brisbane City Council'),
+        'objectives': delegate['objectives'],
+        'interested_sectors': delegate['interested_sectors'],
+        'synergy_analysis': match.get('synergy_analysis')
+    }
 
-        # Get form data
-        user_name = request.form.get('name', '').strip()
-        user_company = request.form.get('company', '').strip()
-        user_email = request.form.get('email', '').strip()
-        user_industry = request.form.get('industry', '').strip()
 
-        if not user_name or not user_company:
-            return jsonify({'error': 'Name and company are required'}), 400
+def store_matches_in_notion(user_info, matches, event=None, profile_hash=None):
+    """Queue every match for Notion; returns how many were queued"""
+    notion_success = 0
+    for i, match in enumerate(matches, 1):
+        try:
+            if store_match_in_notion(user_info, match, rank=i, event=event, profile_hash=profile_hash):
+                notion_success += 1
+            else:
+                print(f"[WARNING] Match {i} not queued for Notion")
+        except Exception as e:
+            print(f"[ERROR] Notion queueing {i} failed: {e}")
+            import traceback
+            traceback.print_exc()
 
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        safe_filename = f"{timestamp}_{filename}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], safe_filename)
-        file.save(filepath)
+    if notion_success > 0:
+        print(f"[NOTION] Queued {notion_success}/{len(matches)} matches for Notion")
+    else:
+        print("[WARNING] No matches queued for Notion")
+    return notion_success
 
-        print(f"[UPLOAD] File saved: {safe_filename}")
 
-        # Extract text from file
-        if filename.lower().endswith('.pdf'):
-            extracted_text = extract_text_from_pdf(filepath)
-        elif filename.lower().endswith('.docx'):
-            extracted_text = extract_text_from_docx(filepath)
-        else:
-            os.remove(filepath)  # Clean up
-            return jsonify({'error': 'Unsupported file format. Please upload PDF or DOCX'}), 400
+def save_abandoned_upload(upload, matches):
+    """
+    Persist a streamed upload whose client disconnected before it finished
 
-        if not extracted_text or len(extracted_text) < 50:
-            os.remove(filepath)
-            return jsonify({'error': 'Could not extract text from file. Please check the file format.'}), 400
+    Analyses that had not arrived get the template text, then the matches
+    are queued for Notion and recorded exactly as a completed upload.
+    """
+    try:
+        for match in matches:
+            if match.get('synergy_analysis') is None:
+                match['synergy_analysis'] = template_synergy_analysis(match['delegate'])
+        store_matches_in_notion(
+            upload['user_info'], matches, event=upload['event'], profile_hash=upload['profile_hash']
+        )
+        finish_upload(upload, matches)
+    except Exception as e:
+        print(f"[ERROR] Saving disconnected upload failed: {e}")
+
+
+def finish_upload(upload, matches):
+    """Build the final response and save it to file for report generation"""
+    user_info = upload['user_info']
+    extraction = upload['extraction']
+    response_data = {
+        'success': True,
+        'user': user_info,
+        'matches': [format_match(m, i + 1) for i, m in enumerate(matches)],
+        'extraction': {
+            'pages_read': extraction['pages_read'],
+            'total_pages': extraction['total_pages']
+        },
+        'timestamp': datetime.now().isoformat()
+    }
 
-        # Combine all user information for matching
-        full_profile = f"""
-Name: {user_name}
-Company: {user_company}
-Email: {user_email}
-Industry: {user_industry}
+    try:
+        MATCH_HISTORY.record(
+            user_info, response_data['matches'], upload['event'],
+            keys=[
+                match_idempotency_key(user_info, match['delegate'], upload['event'], upload['profile_hash'])
+                for match in matches
+            ]
+        )
+    except Exception as e:
+        print(f"[ERROR] Recording match history failed: {e}")
 
-Profile Content:
-{extracted_text[:2000]}  # Limit to first 2000 chars for performance
-"""
+    results_filename = f"{upload['timestamp']}_{user_info['name'].replace(' ', '_')}_results.json"
+    write_upload_file(
+        results_filename,
+        json.dumps(response_data, indent=2, ensure_ascii=False).encode('utf-8')
+    )
 
-        # Perform matching
-        user_info = {
-            'name': user_name,
-            'company': user_company,
-            'email': user_email,
-            'industry': user_industry,
-            'uploaded_file': filename
-        }
+    print(f"[SUCCESS] Matching complete for {user_info['name']}")
+    return response_data
 
-        matches = match_delegates(full_profile, user_info)
 
-        # Add synergy analysis to each match
-        for i, match in enumerate(matches, 1):
-            try:
-                print(f"[ANALYSIS] Generating synergy analysis for match {i}...")
-                match['synergy_analysis'] = generate_synergy_analysis_simple(
-                    full_profile,
-                    match['delegate']
-                )
-                print(f"[OK] Analysis {i} complete")
-            except Exception as e:
-                print(f"[ERROR] Analysis {i} failed: {e}")
-                import traceback
-                traceback.print_exc()
-                # Use fallback simple analysis
-                match['synergy_analysis'] = f"""**Alignment Areas:**
-- {match['delegate']['sector']} sector alignment
+@app.route('/upload', methods=['POST'])
+def upload_file():
+    """Handle file upload and matching"""
+    try:
+        upload, error = prepare_upload()
+        if error:
+            return error
 
-**Collaboration Opportunities:**
-{match['delegate']['objectives'][:150]}...
+        # Perform matching
+        matches = match_delegates(
+            upload['profile'], upload['user_info'],
+            mode=upload['match_mode'], snapshot=upload['snapshot'], event=upload['event']
+        )
 
-**Contact Information:**
-Email: {match['delegate']['email']}
-Phone: {match['delegate'].get('phone', 'Via Brisbane City Council')}
-"""
+        # Add synergy analysis to each match (generated concurrently)
+        print(f"[ANALYSIS] Generating synergy analysis for {len(matches)} matches...")
+        for match, analysis in zip(matches, generate_synergy_analyses(upload['profile'], matches)):
+            match['synergy_analysis'] = analysis
 
         # Store matches in Notion
-        notion_success = 0
-        for i, match in enumerate(matches, 1):
-            try:
-                print(f"[NOTION] Storing match {i} in Notion...")
-                if store_match_in_notion(user_info, match, rank=i):
-                    notion_success += 1
-                    print(f"[OK] Match {i} stored in Notion")
-                else:
-                    print(f"[WARNING] Match {i} not stored in Notion")
-            except Exception as e:
-                print(f"[ERROR] Notion storage {i} failed: {e}")
-                import traceback
-                traceback.print_exc()
-
-        if notion_success > 0:
-            print(f"[NOTION] Stored {notion_success}/{len(matches)} matches in Notion")
-        else:
-            print("[WARNING] No matches stored in Notion")
-
-        # Prepare response
-        response_data = {
-            'success': True,
-            'user': user_info,
-            'matches': [
-                {
-                    'rank': i + 1,
-                    'name': m['delegate']['name'],
-                    'title': m['delegate']['title'],
-                    'company': m['delegate']['company'],
-                    'sector': m['delegate']['sector'],
-                    'score': m['score'],
-                    'email': m['delegate']['email'],
-                    'phone': m['delegate'].get('phone', 'Contact via Brisbane City Council'),
-                    'objectives': m['delegate']['objectives'],
-                    'interested_sectors': m['delegate']['interested_sectors'],
-                    'synergy_analysis': m['synergy_analysis']
-                }
-                for i, m in enumerate(matches)
-            ],
-            'timestamp': datetime.now().isoformat()
-        }
+        store_matches_in_notion(
+            upload['user_info'], matches, event=upload['event'], profile_hash=upload['profile_hash']
+        )
 
-        # Save results to file for report generation
-        results_filename = f"{timestamp}_{user_name.replace(' ', '_')}_results.json"
-        results_path = os.path.join(app.config['UPLOAD_FOLDER'], results_filename)
-        with open(results_path, 'w', encoding='utf-8') as f:
-            json.dump(response_data, f, indent=2, ensure_ascii=False)
+        return jsonify(finish_upload(upload, matches))
 
-        print(f"[SUCCESS] Matching complete for {user_name}")
+    except Exception as e:
+        print(f"[ERROR] Upload failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
 
-        return jsonify(response_data)
 
+@app.route('/upload/stream', methods=['POST'])
+def upload_stream():
+    """
+    Streaming variant of /upload that reports each stage as it finishes
+
+    Takes the same form as /upload. Invalid uploads get the same JSON error
+    responses; otherwise the response is JSON Lines, one event per line:
+        {"type": "matches", "user", "matches", "extraction"}  ranked matches, no analyses yet
+        {"type": "analysis", "rank", "synergy_analysis"}       as each analysis completes
+        {"type": "persistence", "notion_queued", "total"}      once the Notion writes are queued
+        {"type": "complete", ...}                              the full /upload response
+        {"type": "error", "error"}                             if a later stage fails
+    """
+    try:
+        upload, error = prepare_upload()
+        if error:
+            return error
     except Exception as e:
         print(f"[ERROR] Upload failed: {str(e)}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
+    def event_line(event_type, **data):
+        return json.dumps(dict(type=event_type, **data), ensure_ascii=False) + "\n"
+
+    def generate():
+        matches = None
+        saved = False
+        try:
+            matches = match_delegates(
+                upload['profile'], upload['user_info'],
+                mode=upload['match_mode'], snapshot=upload['snapshot'], event=upload['event']
+            )
+            yield event_line(
+                'matches',
+                user=upload['user_info'],
+                matches=[format_match(m, i + 1) for i, m in enumerate(matches)],
+                extraction={
+                    'pages_read': upload['extraction']['pages_read'],
+                    'total_pages': upload['extraction']['total_pages']
+                }
+            )
+
+            print(f"[ANALYSIS] Generating synergy analysis for {len(matches)} matches...")
+            for index, analysis in iter_synergy_analyses(upload['profile'], matches):
+                matches[index]['synergy_analysis'] = analysis
+                yield event_line('analysis', rank=index + 1, synergy_analysis=analysis)
+
+            stored = store_matches_in_notion(
+                upload['user_info'], matches, event=upload['event'], profile_hash=upload['profile_hash']
+            )
+            response_data = finish_upload(upload, matches)
+            saved = True
+            yield event_line('persistence', notion_queued=stored, total=len(matches))
+
+            yield event_line('complete', **response_data)
+
+        except GeneratorExit:
+            # The client went away (the server closes the generator at its next
+            # yield); save the results anyway, as /upload would have
+            if matches is not None and not saved:
+                print("[STREAM] Client disconnected - saving results in the background")
+                upload_writer.submit(save_abandoned_upload, upload, matches)
+            raise
+
+        except Exception as e:
+            print(f"[ERROR] Upload stream failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            yield event_line('error', error=f'Server error: {str(e)}')
+
+    # Ask proxies not to buffer, so each line reaches the browser when it is written
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 
 @app.route('/download_pdf', methods=['POST'])
 def download_pdf():
@@ -501,31 +1320,202 @@ def download_report(filename):
 
 @app.route('/api/delegates')
 def get_delegates():
-    """API endpoint to get all delegates (for testing)"""
+    """API endpoint to get all delegates, or one event's with ?event= (for testing)"""
+    delegates = DELEGATE_STORE.current().delegates
+    event = request.args.get('event', '').strip()
+    if event:
+        try:
+            delegates = get_event_shard(event).delegates
+        except KeyError:
+            return jsonify({'error': 'Unknown event'}), 404
+    sectors = delegates.categorical('sector')
     return jsonify({
-        'total': len(DELEGATES),
+        'total': len(delegates),
         'delegates': [
             {
-                'name': d['name'],
-                'company': d['company'],
-                'sector': d['sector']
+                'id': int(delegate_id),
+                'name': name,
+                'company': company,
+                'sector': sectors.categories[code]
             }
-            for d in DELEGATES
+            for delegate_id, name, company, code in zip(
+                delegates.source_ids, delegates.column('name'), delegates.column('company'), sectors.codes
+            )
         ]
     })
 
 
+@app.route('/api/delegates/reload', methods=['POST'])
+def reload_delegates():
+    """Rebuild delegate indexes from delegates.json in the background"""
+    denied = admin_denied()
+    if denied:
+        return denied
+
+    DELEGATE_STORE.reload_async(force=True)
+    return jsonify({'success': True, 'status': DELEGATE_STORE.status()}), 202
+
+
+@app.route('/api/delegates/status')
+def delegates_status():
+    """Delegate snapshot version and reload state"""
+    return jsonify(DELEGATE_STORE.status())
+
+
+@app.route('/api/match/batch', methods=['POST'])
+def match_batch():
+    """
+    Match many profiles in one call, streaming results back as JSON Lines
+
+    Body: {"profiles": [{"id", "name", "company", "email", "industry", "text"} | "text", ...],
+           "k": 3, "match_mode": "keyword" | "embedding"}
+    """
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data.get('profiles'), list) or not data['profiles']:
+        return jsonify({'error': 'Request body must include a non-empty "profiles" list'}), 400
+
+    profiles = data['profiles']
+    if len(profiles) > MAX_BATCH_PROFILES:
+        return jsonify({'error': f'Too many profiles (max {MAX_BATCH_PROFILES} per batch)'}), 400
+
+    try:
+        k = int(data.get('k', 3))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'k must be an integer'}), 400
+    k = max(1, min(k, MAX_BATCH_TOP_K))
+
+    match_mode = str(data.get('match_mode') or '').strip().lower() or None
+    if match_mode and match_mode not in MATCH_MODES:
+        return jsonify({'error': f"Unsupported match mode. Use one of: {', '.join(MATCH_MODES)}"}), 400
+
+    snapshot = DELEGATE_STORE.current()
+    event = str(data.get('event') or '').strip() or DEFAULT_EVENT
+    if event not in snapshot.shards:
+        return jsonify({'error': f"Unknown event. Use one of: {', '.join(snapshot.shards)}"}), 400
+
+    profile_ids = []
+    profile_texts = []
+    for i, profile in enumerate(profiles):
+        if isinstance(profile, str):
+            profile = {'text': profile}
+        if not isinstance(profile, dict) or not str(profile.get('text') or '').strip():
+            return jsonify({'error': f'Profile {i} has no text'}), 400
+        profile_ids.append(profile.get('id'))
+        profile_texts.append(build_user_profile(profile, str(profile['text'])))
+
+    def generate():
+        results = match_delegates_batch(profile_texts, k=k, mode=match_mode, snapshot=snapshot, event=event)
+        for i, (profile_id, matches) in enumerate(zip(profile_ids, results)):
+            line = {
+                'index': i,
+                'id': profile_id,
+                'event': event,
+                'matches': [
+                    {
+                        'rank': rank,
+                        'name': m['delegate']['name'],
+                        'title': m['delegate']['title'],
+                        'company': m['delegate']['company'],
+                        'sector': m['delegate']['sector'],
+                        'score': m['score'],
+                        'email': m['delegate']['email']
+                    }
+                    for rank, m in enumerate(matches, 1)
+                ]
+            }
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def parse_history_time(value):
+    """Epoch seconds for an ISO date or datetime query parameter (None if absent)"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+def history_filters():
+    """Match-history filters from the query string; raises ValueError on bad dates"""
+    day = request.args.get('day', '').strip() or None
+    if day == 'today':
+        day = datetime.now().strftime('%Y-%m-%d')
+    elif day:
+        day = datetime.strptime(day, '%Y-%m-%d').strftime('%Y-%m-%d')
+    return {
+        'delegate': request.args.get('delegate', '').strip() or None,
+        'user_email': request.args.get('email', '').strip() or None,
+        'event': request.args.get('event', '').strip() or None,
+        'sector': request.args.get('sector', '').strip() or None,
+        'day': day,
+        'since': parse_history_time(request.args.get('since', '').strip()),
+        'until': parse_history_time(request.args.get('until', '').strip())
+    }
+
+
+@app.route('/api/matches')
+def get_match_history():
+    """
+    Past matches, newest first, from the local match-history store
+
+    Filters: ?delegate=, ?email=, ?event=, ?sector=, ?day=YYYY-MM-DD|today,
+    ?since= / ?until= (ISO date or datetime); paging with ?limit= (max 500) and ?offset=
+    """
+    denied = admin_denied()
+    if denied:
+        return denied
+
+    try:
+        filters = history_filters()
+        limit = min(max(int(request.args.get('limit', 100)), 1), 500)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query parameter: {e}'}), 400
+
+    return jsonify({
+        'total': MATCH_HISTORY.count(**filters),
+        'limit': limit,
+        'offset': offset,
+        'matches': MATCH_HISTORY.query(limit=limit, offset=offset, **filters)
+    })
+
+
+@app.route('/api/matches/summary')
+def get_match_summary():
+    """Match counts grouped ?by=sector|delegate|event|day|user, with the /api/matches filters"""
+    denied = admin_denied()
+    if denied:
+        return denied
+
+    by = request.args.get('by', 'sector').strip().lower()
+    if by not in GROUP_COLUMNS:
+        return jsonify({'error': f"Unsupported grouping. Use one of: {', '.join(GROUP_COLUMNS)}"}), 400
+    try:
+        filters = history_filters()
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query parameter: {e}'}), 400
+
+    return jsonify({'by': by, 'groups': MATCH_HISTORY.summary(by=by, **filters)})
+
+
 @app.route('/api/stats')
 def get_stats():
     """Get system statistics"""
-    sectors = {}
-    for delegate in DELEGATES:
-        sector = delegate['sector']
-        sectors[sector] = sectors.get(sector, 0) + 1
+    snapshot = DELEGATE_STORE.current()
+    delegates = snapshot.delegates
+    sectors = delegates.categorical('sector').counts()
 
     return jsonify({
-        'total_delegates': len(DELEGATES),
+        'total_delegates': len(delegates),
         'sectors': sectors,
+        'events': {event: len(shard) for event, shard in snapshot.shards.items()},
+        'extraction': EXTRACTION_POOL.status() if EXTRACTION_POOL else None,
+        'result_cache': RESULT_CACHE.status() if RESULT_CACHE else None,
+        'llm': gemini_client.status() if gemini_model else None,
+        'notion_queue': NOTION_QUEUE.status() if NOTION_QUEUE else None,
+        'match_history': MATCH_HISTORY.status(),
+        'synergy_cache': dict(SYNERGY_CACHE.status(), prompt_version=SYNERGY_PROMPT_VERSION) if SYNERGY_CACHE else None,
+        'uploads': UPLOAD_RETENTION.status(),
         'version': '1.0.0',
         'event': 'Boldly Brisbane Forum & APCS 2025'
     })
@@ -554,7 +1544,7 @@ if __name__ == '__main__':
     print("Brisbane Business Bridge AI")
     print("AI-Powered Delegate Matching System")
     print("=" * 60)
-    print(f"Delegates loaded: {len(DELEGATES)}")
+    print(f"Delegates loaded: {len(DELEGATE_STORE.current())}")
     print(f"Upload folder: {app.config['UPLOAD_FOLDER']}")
     print("=" * 60)
     print("\nStarting server...")
@@ -0,0 +1,104 @@
+"""
+Multi-Pattern Phrase Automaton for Brisbane Business Bridge AI
+Aho-Corasick matcher that finds every delegate phrase in one pass over a profile
+"""
+
+# Phrase boundary modes:
+#   'substring' - a phrase matches anywhere, e.g. 'invest' in 'reinvestment'
+#   'prefix'    - a phrase must start at a word boundary, e.g. 'invest' in 'investment'
+#   'word'      - a phrase must start and end at word boundaries
+BOUNDARY_MODES = ('substring', 'prefix', 'word')
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of phrases
+
+    Built once from the delegate vocabulary. find_all() scans a text once,
+    regardless of how many phrases there are, and returns the ids of every
+    phrase that occurs in it under the configured boundary mode.
+    """
+
+    def __init__(self, phrases, boundary='substring'):
+        """
+        Args:
+            phrases: Mapping of phrase -> phrase id (phrases already normalized)
+            boundary: One of BOUNDARY_MODES
+        """
+        if boundary not in BOUNDARY_MODES:
+            raise ValueError(f"Unknown boundary mode '{boundary}'. Use one of: {', '.join(BOUNDARY_MODES)}")
+        self.boundary = boundary
+
+        # Node 0 is the root; goto[node] maps a character to the next node
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for phrase, phrase_id in phrases.items():
+            if phrase:
+                self._insert(phrase, phrase_id)
+        self._build_failure_links()
+
+    def __len__(self):
+        return len(self._goto)
+
+    def _insert(self, phrase, phrase_id):
+        node = 0
+        for ch in phrase:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = next_node
+        self._output[node] = self._output[node] + ((phrase_id, len(phrase)),)
+
+    def _build_failure_links(self):
+        """Breadth-first pass linking each node to its longest proper suffix"""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                suffix = self._goto[fallback].get(ch, 0)
+
+                self._fail[child] = suffix if suffix != child else 0
+                # Inherit matches that end at the suffix node
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text):
+        """Return the set of phrase ids occurring in text (text already normalized)"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        check_start = self.boundary != 'substring'
+        check_end = self.boundary == 'word'
+
+        hits = set()
+        node = 0
+        for end, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+
+            for phrase_id, length in output[node]:
+                if phrase_id in hits:
+                    continue
+                if check_start:
+                    start = end - length + 1
+                    if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                        continue
+                if check_end and end + 1 < len(text) and _is_word_char(text[end + 1]) and _is_word_char(ch):
+                    continue
+                hits.add(phrase_id)
+
+        return hits
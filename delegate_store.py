@@ -0,0 +1,193 @@
+"""
+Delegate Store for Brisbane Business Bridge AI
+Hot-reloadable delegate snapshots with background rebuild and atomic swap
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from delegate_table import DelegateTable
+
+
+def partition_by_event(delegates, default_event):
+    """
+    Map event name -> delegate ids attending it
+
+    A delegate's events come from its 'events' list or 'event' field;
+    delegates with neither belong to default_event. A delegate may attend
+    several events and then appears in each partition. A single string in
+    'events' is one event name; other non-list values are ignored.
+    """
+    events_column = delegates.column('events')
+    event_column = delegates.column('event')
+
+    partitions = {}
+    for row in range(len(delegates)):
+        events = events_column[row]
+        if isinstance(events, str):
+            events = [events]
+        elif isinstance(events, (list, tuple)):
+            events = [event for event in events if isinstance(event, str) and event]
+        else:
+            events = None
+        events = events or ([event_column[row]] if event_column[row] else [default_event])
+        for event in dict.fromkeys(events):
+            partitions.setdefault(event, []).append(row)
+    return partitions
+
+
+class _IndexedDelegates:
+    """Delegate table plus named index objects, exposed as attributes"""
+
+    def __init__(self, delegates, **indexes):
+        self.delegates = delegates
+        self.indexes = indexes
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['indexes'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __len__(self):
+        return len(self.delegates)
+
+
+class EventShard(_IndexedDelegates):
+    """One event's delegates and the matching indexes built over only them"""
+
+    def __init__(self, event, delegates, **indexes):
+        super().__init__(delegates, **indexes)
+        self.event = event
+
+
+class DelegateSnapshot(_IndexedDelegates):
+    """
+    Immutable view of the delegate list and everything built from it
+
+    Requests grab one snapshot and use it throughout, so they never see a
+    delegate list from one version scored by indexes from another.
+    """
+
+    def __init__(self, delegates, version, loaded_at, **indexes):
+        super().__init__(delegates, **indexes)
+        self.version = version
+        self.loaded_at = loaded_at
+
+
+class DelegateStore:
+    """
+    Watches delegates.json and swaps in rebuilt snapshots atomically
+
+    Delegates are held in a columnar DelegateTable. build_indexes(table)
+    returns a dict of index objects (keyword index, embedding matcher, ...)
+    stored on the snapshot. Reloads run on a
+    background thread; current() keeps returning the previous snapshot until
+    the new one is fully built, then a single reference assignment swaps it.
+    A file that fails to parse or build is skipped and the old snapshot
+    stays live.
+    """
+
+    def __init__(self, path, build_indexes, poll_interval=5.0):
+        self.path = Path(path)
+        self.build_indexes = build_indexes
+        self.poll_interval = poll_interval
+        self.reload_count = 0
+        self.last_error = None
+
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self._file_signature = self._signature()
+        self._snapshot = self._build(version=1)
+
+    def current(self):
+        """Return the live snapshot"""
+        return self._snapshot
+
+    def _signature(self):
+        """(mtime, size) of the delegates file, or None if it is missing"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _build(self, version):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            delegates = DelegateTable(json.load(f))
+        indexes = self.build_indexes(delegates)
+        return DelegateSnapshot(delegates, version, datetime.now(), **indexes)
+
+    def reload(self, force=False):
+        """
+        Rebuild and swap the snapshot if the file changed (or if forced)
+
+        Returns True when a new snapshot was swapped in. Concurrent callers
+        do not queue up: if a reload is already running this returns False.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+
+        try:
+            signature = self._signature()
+            if signature is None or (signature == self._file_signature and not force):
+                return False
+
+            started = time.perf_counter()
+            try:
+                snapshot = self._build(version=self._snapshot.version + 1)
+            except Exception as e:
+                # Don't retry this version of the file until it changes again
+                self._file_signature = signature
+                self.last_error = str(e)
+                print(f"[WARNING] Delegate reload failed, keeping version {self._snapshot.version}: {e}")
+                return False
+
+            self._snapshot = snapshot
+            self._file_signature = signature
+            self.reload_count += 1
+            self.last_error = None
+            print(f"[RELOADED] {len(snapshot)} delegates (version {snapshot.version}) "
+                  f"in {time.perf_counter() - started:.2f}s")
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def reload_async(self, force=False):
+        """Start a background reload and return immediately"""
+        thread = threading.Thread(target=self.reload, kwargs={'force': force}, daemon=True)
+        thread.start()
+        return thread
+
+    def start_watching(self):
+        """Poll the delegates file for changes on a daemon thread"""
+        if self._watcher is not None or not self.poll_interval:
+            return
+
+        def watch():
+            while not self._stop.wait(self.poll_interval):
+                if self._signature() != self._file_signature:
+                    self.reload()
+
+        self._watcher = threading.Thread(target=watch, name='delegate-store-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def status(self):
+        """Reload state for monitoring"""
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version,
+            'delegates': len(snapshot),
+            'loaded_at': snapshot.loaded_at.isoformat(),
+            'reload_count': self.reload_count,
+            'reload_in_progress': self._reload_lock.locked(),
+            'last_error': self.last_error
+        }
@@ -0,0 +1,173 @@
+"""
+Columnar Delegate Table for Brisbane Business Bridge AI
+Compact column-oriented storage of delegate records with integer ids
+"""
+
+import hashlib
+import json
+import sys
+from collections.abc import Sequence
+
+import numpy as np
+
+# Low-cardinality fields stored as integer codes into a category list
+CATEGORICAL_FIELDS = ('sector', 'business_type')
+
+# Marks a field that a delegate record did not have
+_MISSING = object()
+
+
+class CategoricalColumn:
+    """Column of repeated strings stored as int32 codes into a category list"""
+
+    __slots__ = ('categories', 'codes', '_lookup')
+
+    def __init__(self, values):
+        self.categories = []
+        self._lookup = {}
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            codes[i] = self.code_for(value)
+        self.codes = codes
+
+    def code_for(self, value):
+        """Return the code for a value, adding it as a new category if unseen"""
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(value if not isinstance(value, str) else sys.intern(value))
+            self._lookup[value] = code
+        return code
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self.categories[self.codes[row]]
+
+    def counts(self):
+        """{category: number of rows}, in first-seen category order"""
+        counts = np.bincount(self.codes, minlength=len(self.categories))
+        return {
+            category: int(count)
+            for category, count in zip(self.categories, counts)
+            if category is not _MISSING
+        }
+
+
+class DelegateTable(Sequence):
+    """
+    Delegate records stored column by column
+
+    Each field is one Python list (or a CategoricalColumn for sector and
+    business_type) instead of one dict per delegate, and a delegate's id is
+    its row number. Indexing the table with an id rebuilds the delegate as a
+    plain dict, so only the few delegates a request actually returns are
+    materialized.
+    """
+
+    def __init__(self, records):
+        records = list(records)
+        self._size = len(records)
+        self._source_rows = None
+
+        # Preserve field order as first seen across all records
+        self.fields = list(dict.fromkeys(field for record in records for field in record))
+
+        # Repeated strings (company names, titles, shared emails) are stored once
+        shared = {}
+
+        def dedupe(value):
+            return shared.setdefault(value, value) if isinstance(value, str) else value
+
+        self.columns = {}
+        for field in self.fields:
+            values = [record.get(field, _MISSING) for record in records]
+            if field in CATEGORICAL_FIELDS:
+                self.columns[field] = CategoricalColumn(values)
+            elif field == 'interested_sectors':
+                self.columns[field] = [
+                    tuple(sys.intern(s) for s in value) if value is not _MISSING else value
+                    for value in values
+                ]
+            else:
+                self.columns[field] = [dedupe(value) for value in values]
+
+        for field in CATEGORICAL_FIELDS:
+            if field not in self.columns:
+                self.columns[field] = CategoricalColumn([_MISSING] * self._size)
+
+    @property
+    def ids(self):
+        """Integer delegate ids (row numbers)"""
+        return np.arange(self._size)
+
+    @property
+    def source_ids(self):
+        """Ids of these delegates in the full table they were take()n from (same as ids for a full table)"""
+        return self.ids if self._source_rows is None else self._source_rows
+
+    def __len__(self):
+        return self._size
+
+    def column(self, field):
+        """Return a field's values in id order; missing values are None"""
+        column = self.columns.get(field, [_MISSING] * self._size)
+        if isinstance(column, CategoricalColumn):
+            column = [column.categories[code] for code in column.codes]
+        return [None if value is _MISSING else value for value in column]
+
+    def categorical(self, field):
+        """Return the CategoricalColumn for sector or business_type"""
+        return self.columns[field]
+
+    def value(self, row, field, default=None):
+        """Single field of one delegate without materializing the record"""
+        column = self.columns.get(field)
+        if column is None:
+            return default
+        value = column[row]
+        return default if value is _MISSING else value
+
+    def take(self, rows):
+        """New table holding only the given delegate ids (strings are shared, not copied)"""
+        table = DelegateTable.__new__(DelegateTable)
+        table._size = len(rows)
+        table._source_rows = self.source_ids[np.asarray(rows, dtype=np.int64)]
+        table.fields = list(self.fields)
+        table.columns = {}
+        for field, column in self.columns.items():
+            if isinstance(column, CategoricalColumn):
+                table.columns[field] = CategoricalColumn([column[row] for row in rows])
+            else:
+                table.columns[field] = [column[row] for row in rows]
+        return table
+
+    def fingerprint(self):
+        """SHA-256 of the table contents; changes whenever any delegate does"""
+        if getattr(self, '_fingerprint', None) is None:
+            digest = hashlib.sha256()
+            for row in range(self._size):
+                digest.update(json.dumps(self.record(row), sort_keys=True, default=str).encode('utf-8'))
+                digest.update(b'\n')
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def record(self, row):
+        """Rebuild delegate `row` as a plain dict"""
+        record = {}
+        for field in self.fields:
+            value = self.columns[field][row]
+            if value is _MISSING:
+                continue
+            record[field] = list(value) if field == 'interested_sectors' else value
+        return record
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self.record(i) for i in range(*row.indices(self._size))]
+        if row < 0:
+            row += self._size
+        if not 0 <= row < self._size:
+            raise IndexError('delegate id out of range')
+        return self.record(row)
@@ -0,0 +1,270 @@
+"""
+Semantic Embedding Matcher for Brisbane Business Bridge AI
+Sentence-transformer delegate matching with an on-disk embedding cache
+"""
+
+import hashlib
+import importlib.util
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from ann_index import IVFIndex, DEFAULT_NPROBE
+from delegate_table import DelegateTable
+from matching import top_k_indices, BATCH_CHUNK_SIZE
+
+DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2'
+DEFAULT_CACHE_PATH = Path(__file__).parent / "data" / "delegate_embeddings.pkl"
+DEFAULT_ANN_PATH = Path(__file__).parent / "data" / "delegate_ann.npz"
+
+# Below this many delegates exact search is fast enough
+DEFAULT_ANN_MIN_DELEGATES = 5000
+
+
+def delegate_text(delegate):
+    """Text representation of a delegate used for embedding"""
+    return f"{delegate['name']} {delegate['company']} {delegate['sector']} {delegate['objectives']}"
+
+
+def delegate_content_hash(delegate):
+    """Stable hash of the delegate content that feeds the embedding"""
+    return hashlib.sha256(delegate_text(delegate).encode('utf-8')).hexdigest()
+
+
+# One SentenceTransformer per model name, shared by every matcher in the process
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder(model_name):
+    """Load a sentence-transformer model once per process and reuse it"""
+    with _encoders_lock:
+        encoder = _encoders.get(model_name)
+        if encoder is None:
+            from sentence_transformers import SentenceTransformer
+            encoder = _encoders[model_name] = SentenceTransformer(model_name)
+        return encoder
+
+
+def sentence_transformers_available():
+    """
+    Check whether the optional sentence-transformers stack is installed
+
+    Only looks the package up; importing it would load torch in every
+    worker even when embedding matching is off. get_encoder() imports it.
+    """
+    return importlib.util.find_spec('sentence_transformers') is not None
+
+
+class EmbeddingCache:
+    """
+    On-disk store of delegate embeddings keyed by content hash
+
+    The cache file is replaced atomically, so gunicorn workers can share it
+    and a reader never sees a partially written file. Entries computed with
+    a different model are ignored.
+    """
+
+    def __init__(self, path, model_name):
+        self.path = Path(path)
+        self.model_name = model_name
+
+    def load(self):
+        """Return {content_hash: vector} for this model, or {} if unavailable"""
+        try:
+            with open(self.path, 'rb') as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"[WARNING] Could not read embedding cache {self.path}: {e}")
+            return {}
+
+        if payload.get('model') != self.model_name:
+            return {}
+        return payload.get('vectors', {})
+
+    def save(self, vectors):
+        """Atomically write the cache file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'model': self.model_name, 'vectors': vectors}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+
+class EmbeddingMatcher:
+    """
+    Cosine-similarity matcher over sentence-transformer embeddings
+
+    The model (one per process, shared through get_encoder) and delegate
+    embeddings are loaded lazily on first use. Only delegates whose content
+    hash is missing from the cache are encoded.
+    Pools of ann_min_delegates or more are searched through a persisted IVF
+    index instead of by brute force; nprobe trades recall for latency.
+    """
+
+    def __init__(self, delegates, cache_path=DEFAULT_CACHE_PATH, model_name=DEFAULT_MODEL_NAME,
+                 ann_path=DEFAULT_ANN_PATH, ann_min_delegates=DEFAULT_ANN_MIN_DELEGATES,
+                 nprobe=DEFAULT_NPROBE):
+        self.delegates = delegates if isinstance(delegates, DelegateTable) else DelegateTable(delegates)
+        self.model_name = model_name
+        self.cache = EmbeddingCache(cache_path, model_name)
+        self.ann_path = Path(ann_path) if ann_path else None
+        self.ann_min_delegates = ann_min_delegates
+        self.nprobe = nprobe
+        self.encoder = None
+        self.delegate_embeddings = None
+        self.delegate_hashes = []
+        self.ann_index = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.delegates)
+
+    def _get_encoder(self):
+        if self.encoder is None:
+            self.encoder = get_encoder(self.model_name)
+        return self.encoder
+
+    def _encode(self, texts):
+        """Encode texts into unit-length float32 vectors"""
+        return self._get_encoder().encode(
+            texts,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+
+    def _embed_delegates(self, delegates, cached):
+        """Return (hashes, vectors, changed) for delegates, encoding cache misses into cached"""
+        hashes = [delegate_content_hash(d) for d in delegates]
+        missing = [i for i, h in enumerate(hashes) if h not in cached]
+
+        if missing:
+            print(f"[EMBEDDINGS] Encoding {len(missing)}/{len(delegates)} changed delegates")
+            vectors = self._encode([delegate_text(delegates[i]) for i in missing])
+            for i, vector in zip(missing, vectors):
+                cached[hashes[i]] = vector
+
+        dimension = self._get_encoder().get_sentence_embedding_dimension()
+        vectors = (
+            np.vstack([cached[h] for h in hashes]) if hashes
+            else np.empty((0, dimension), dtype=np.float32)
+        )
+        return hashes, vectors, bool(missing)
+
+    def load(self):
+        """Load the model and delegate embeddings, encoding only changed delegates"""
+        with self._lock:
+            if self.delegate_embeddings is not None:
+                return
+
+            cached = self.cache.load()
+            hashes, vectors, changed = self._embed_delegates(self.delegates, cached)
+
+            if changed:
+                # Keep only embeddings for the current delegate set
+                current = set(hashes)
+                self.cache.save({h: v for h, v in cached.items() if h in current})
+            else:
+                print(f"[EMBEDDINGS] Loaded {len(self.delegates)} delegate embeddings from cache")
+
+            self.delegate_hashes = hashes
+            self.delegate_embeddings = vectors
+
+            if len(self.delegates) >= self.ann_min_delegates:
+                self.ann_index = self._load_or_build_ann()
+
+    def _load_or_build_ann(self):
+        """Reuse the persisted ANN index, inserting delegates appended since it was saved"""
+        metadata = {'model': self.model_name, 'hashes': self.delegate_hashes}
+
+        if self.ann_path and self.ann_path.exists():
+            try:
+                index, stored = IVFIndex.load(self.ann_path)
+                stored_hashes = stored.get('hashes', [])
+                if (stored.get('model') == self.model_name
+                        and stored_hashes == self.delegate_hashes[:len(stored_hashes)]):
+                    new_rows = np.arange(len(stored_hashes), len(self.delegate_hashes))
+                    if len(new_rows):
+                        index.add(self.delegate_embeddings[new_rows], new_rows)
+                        index.save(self.ann_path, metadata)
+                    index.nprobe = self.nprobe
+                    print(f"[ANN] Loaded index with {index.n_lists} lists, {len(new_rows)} new delegates inserted")
+                    return index
+            except Exception as e:
+                print(f"[WARNING] Could not load ANN index {self.ann_path}: {e}")
+
+        print(f"[ANN] Building index over {len(self.delegates)} delegates")
+        index = IVFIndex(self.delegate_embeddings.shape[1], nprobe=self.nprobe)
+        index.train(self.delegate_embeddings)
+        index.add(self.delegate_embeddings, np.arange(len(self.delegates)))
+        if self.ann_path:
+            index.save(self.ann_path, metadata)
+        return index
+
+    def add_delegates(self, delegates):
+        """Incrementally insert new delegates without re-encoding existing ones"""
+        self.load()
+        with self._lock:
+            cached = dict(zip(self.delegate_hashes, self.delegate_embeddings))
+            hashes, vectors, changed = self._embed_delegates(delegates, cached)
+            if changed:
+                self.cache.save(cached)
+
+            new_rows = np.arange(len(self.delegates), len(self.delegates) + len(delegates))
+            self.delegates = DelegateTable(list(self.delegates) + list(delegates))
+            self.delegate_hashes = self.delegate_hashes + hashes
+            self.delegate_embeddings = np.vstack([self.delegate_embeddings, vectors])
+
+            if self.ann_index is not None:
+                self.ann_index.add(vectors, new_rows)
+                if self.ann_path:
+                    self.ann_index.save(self.ann_path, {'model': self.model_name, 'hashes': self.delegate_hashes})
+            elif len(self.delegates) >= self.ann_min_delegates:
+                self.ann_index = self._load_or_build_ann()
+
+    @staticmethod
+    def _to_score(similarities):
+        return np.rint(np.clip(similarities, 0, 1) * 100).astype(np.int32)
+
+    def score_all(self, user_text):
+        """Score a profile against every delegate as a 0-100 similarity"""
+        self.load()
+        return self._to_score(self.delegate_embeddings @ self._encode([user_text])[0])
+
+    def top_k(self, user_text, k=3, nprobe=None):
+        """Return the k best (delegate index, score) pairs for a profile"""
+        self.load()
+        query = self._encode([user_text])[0]
+
+        if self.ann_index is not None:
+            ids, similarities = self.ann_index.search(query, k, nprobe=nprobe)
+            return [(int(i), int(score)) for i, score in zip(ids, self._to_score(similarities))]
+
+        scores = self._to_score(self.delegate_embeddings @ query)
+        return [(int(i), int(scores[i])) for i in top_k_indices(scores, k)]
+
+    def top_k_batch(self, user_texts, k=3, chunk_size=BATCH_CHUNK_SIZE, nprobe=None):
+        """Yield the k best (delegate index, score) pairs for each profile, in order"""
+        self.load()
+        for start in range(0, len(user_texts), chunk_size):
+            queries = self._encode(list(user_texts[start:start + chunk_size]))
+
+            if self.ann_index is not None:
+                for query in queries:
+                    ids, similarities = self.ann_index.search(query, k, nprobe=nprobe)
+                    yield [(int(i), int(score)) for i, score in zip(ids, self._to_score(similarities))]
+                continue
+
+            for row in self._to_score(queries @ self.delegate_embeddings.T):
+                yield [(int(i), int(row[i])) for i in top_k_indices(row, k)]
@@ -3,6 +3,7 @@ Extract delegate information from Brisbane Business Mission Booklet PDF
 """
 
 import json
+import os
 import re
 from pathlib import Path
 
@@ -537,8 +538,11 @@ def save_delegates_json():
     output_path = Path(__file__).parent / "data" / "delegates.json"
     output_path.parent.mkdir(exist_ok=True)
 
-    with open(output_path, 'w', encoding='utf-8') as f:
+    # Write to a temp file and swap it in, so the running app never reads a partial file
+    tmp_path = output_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(delegates, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
 
     print(f"[OK] Extracted {len(delegates)} delegates")
     print(f"[SAVED] Saved to: {output_path}")
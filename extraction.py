@@ -0,0 +1,353 @@
+"""
+Document Text Extraction for Brisbane Business Bridge AI
+Extracts profile text from uploaded PDF and DOCX files held in memory
+"""
+
+import io
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+
+import PyPDF2
+import docx
+
+try:
+    import resource
+except ImportError:  # Windows has no per-process resource limits
+    resource = None
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+
+class ExtractionError(Exception):
+    """A document could not be extracted by the worker pool"""
+
+
+class ExtractionTimeout(ExtractionError):
+    """A document took longer than the per-document deadline"""
+
+
+class ExtractionPoolBusy(ExtractionError):
+    """Every extraction worker stayed busy for longer than the queue timeout"""
+
+
+def _as_stream(source):
+    """Accept raw bytes, a binary file object or a path"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def extract_pdf(source, max_chars=None, max_pages=None):
+    """
+    Extract PDF text page by page, stopping once a budget is met
+
+    Pages are parsed lazily, so with max_chars set a long document only
+    costs as many pages as it takes to collect that much text.
+
+    Args:
+        source: PDF bytes, binary stream or path
+        max_chars: Stop after at least this many characters (None = no limit)
+        max_pages: Read at most this many pages (None = no limit)
+
+    Returns:
+        Dictionary with text, pages_read and total_pages
+    """
+    parts = []
+    collected = 0
+    pages_read = 0
+    total_pages = 0
+    try:
+        reader = PyPDF2.PdfReader(_as_stream(source))
+        total_pages = len(reader.pages)
+        for page in reader.pages:
+            if max_pages is not None and pages_read >= max_pages:
+                break
+            if max_chars is not None and collected >= max_chars:
+                break
+            page_text = page.extract_text() + "\n"
+            parts.append(page_text)
+            collected += len(page_text)
+            pages_read += 1
+    except Exception as e:
+        print(f"[ERROR] PDF extraction failed: {e}")
+
+    return {'text': "".join(parts), 'pages_read': pages_read, 'total_pages': total_pages}
+
+
+def extract_docx(source, max_chars=None):
+    """
+    Extract DOCX paragraph text, stopping once max_chars is collected
+
+    Returns:
+        Dictionary with text, pages_read and total_pages (always 0 for DOCX,
+        which has no fixed pages)
+    """
+    parts = []
+    collected = 0
+    try:
+        doc = docx.Document(_as_stream(source))
+        for para in doc.paragraphs:
+            if max_chars is not None and collected >= max_chars:
+                break
+            parts.append(para.text)
+            collected += len(para.text) + 1
+    except Exception as e:
+        print(f"[ERROR] DOCX extraction failed: {e}")
+
+    return {'text': "\n".join(parts), 'pages_read': 0, 'total_pages': 0}
+
+
+def extract_text_from_pdf(source):
+    """Extract text content from a PDF (bytes, binary stream or path)"""
+    return extract_pdf(source)['text']
+
+
+def extract_text_from_docx(source):
+    """Extract text content from a DOCX (bytes, binary stream or path)"""
+    return extract_docx(source)['text']
+
+
+def extract_document(source, filename, max_chars=None, max_pages=None):
+    """
+    Extract text from an uploaded document, choosing the parser by extension
+
+    Returns the extraction dictionary (text, pages_read, total_pages), or
+    None for unsupported file types
+    """
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        return extract_pdf(source, max_chars=max_chars, max_pages=max_pages)
+    if name.endswith('.docx'):
+        return extract_docx(source, max_chars=max_chars)
+    return None
+
+
+def extract_text(source, filename, max_chars=None, max_pages=None):
+    """Extract text from an uploaded document; None for unsupported file types"""
+    result = extract_document(source, filename, max_chars=max_chars, max_pages=max_pages)
+    return None if result is None else result['text']
+
+
+# =============================================================================
+# ISOLATED EXTRACTION WORKERS
+# =============================================================================
+
+def _address_space_bytes():
+    """Current virtual memory size of this process (0 where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _set_memory_limit(memory_limit_mb):
+    """Allow the worker memory_limit_mb of address space beyond what it already uses"""
+    if resource and memory_limit_mb:
+        limit = _address_space_bytes() + memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+# Serializes worker starts while __main__ is temporarily hidden
+_start_lock = threading.Lock()
+
+
+@contextmanager
+def _without_main_import():
+    """
+    Start worker processes without re-running the launching script
+
+    spawn and forkserver children normally re-import __main__, which under
+    `python app.py` would repeat all of the app's startup work (delegate
+    loading, background threads) in every extraction worker. Workers only
+    need this module, so __main__ is hidden while a worker starts.
+    """
+    main = sys.modules.get('__main__')
+    with _start_lock:
+        if main is None:
+            yield
+            return
+        saved = {name: main.__dict__[name] for name in ('__file__', '__spec__') if name in main.__dict__}
+        main.__dict__.pop('__file__', None)
+        main.__spec__ = None
+        try:
+            yield
+        finally:
+            main.__dict__.update(saved)
+
+
+def _set_cpu_budget(cpu_seconds):
+    """Allow this process cpu_seconds more CPU time before the kernel kills it"""
+    if resource and cpu_seconds:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = int(usage.ru_utime + usage.ru_stime)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = used + int(cpu_seconds) + 1
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _extraction_worker(conn, memory_limit_mb):
+    """Worker process loop: receive documents, send back extraction results"""
+    _set_memory_limit(memory_limit_mb)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        data, filename, max_chars, max_pages, cpu_seconds = job
+        _set_cpu_budget(cpu_seconds)
+        try:
+            conn.send(('ok', extract_document(data, filename, max_chars=max_chars, max_pages=max_pages)))
+        except MemoryError:
+            conn.send(('error', 'Document exceeded the extraction memory limit'))
+            return
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+
+    def kill(self):
+        try:
+            self.conn.close()
+        finally:
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join(timeout=1)
+
+
+class ExtractionPool:
+    """
+    Bounded pool of worker processes that extract uploaded documents
+
+    Parsing runs outside the web worker, so a malformed or hostile document
+    can only stall its own extraction process. Each document gets a
+    wall-clock deadline (the worker is killed and replaced when it expires),
+    a CPU-time budget and a per-process memory cap. Callers beyond
+    max_workers wait up to queue_timeout for a free worker.
+    """
+
+    def __init__(self, max_workers=2, timeout=10.0, cpu_seconds=None, memory_limit_mb=512, queue_timeout=5.0):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds or timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.queue_timeout = queue_timeout
+
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        if 'forkserver' in methods:
+            self._context.set_forkserver_preload([__name__])
+
+        # Each slot holds an idle worker, or None until a worker is first needed
+        self._slots = queue.LifoQueue()
+        for _ in range(max_workers):
+            self._slots.put(None)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'queued': 0,
+            'running': 0,
+            'completed': 0,
+            'timeouts': 0,
+            'failures': 0,
+            'rejected': 0,
+            'worker_restarts': 0
+        }
+
+    def _count(self, key, delta=1):
+        with self._stats_lock:
+            self._stats[key] += delta
+
+    def _start_worker(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_extraction_worker,
+            args=(child_conn, self.memory_limit_mb),
+            name='extraction-worker',
+            daemon=True
+        )
+        with _without_main_import():
+            process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def extract(self, data, filename, max_chars=None, max_pages=None):
+        """
+        Extract a document in a worker process
+
+        Returns the same dictionary as extract_document(), or None for
+        unsupported file types. Raises ExtractionPoolBusy, ExtractionTimeout
+        or ExtractionError.
+        """
+        self._count('queued')
+        try:
+            worker = self._slots.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            self._count('rejected')
+            raise ExtractionPoolBusy('All extraction workers are busy')
+        finally:
+            self._count('queued', -1)
+
+        self._count('running')
+        try:
+            if worker is None or not worker.process.is_alive():
+                if worker is not None:
+                    self._count('worker_restarts')
+                    worker.kill()
+                worker = self._start_worker()
+
+            try:
+                worker.conn.send((bytes(data), filename, max_chars, max_pages, self.cpu_seconds))
+                if not worker.conn.poll(self.timeout):
+                    self._count('timeouts')
+                    worker.kill()
+                    worker = None
+                    raise ExtractionTimeout(f'Extraction exceeded {self.timeout:g}s')
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                # The worker died mid-document (CPU or memory limit, crash)
+                self._count('failures')
+                worker.kill()
+                worker = None
+                raise ExtractionError(f'Extraction worker stopped: {e or "process exited"}')
+
+            if status != 'ok':
+                self._count('failures')
+                raise ExtractionError(payload)
+
+            self._count('completed')
+            return payload
+        finally:
+            self._count('running', -1)
+            self._slots.put(worker)
+
+    def status(self):
+        """Pool counters for monitoring; 'queued' is the current queue depth"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['max_workers'] = self.max_workers
+        stats['timeout_seconds'] = self.timeout
+        return stats
+
+    def shutdown(self):
+        """Stop all idle worker processes"""
+        for _ in range(self.max_workers):
+            try:
+                worker = self._slots.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.kill()
@@ -0,0 +1,216 @@
+"""
+LLM Client Guard for Brisbane Business Bridge AI
+Token-bucket rate limiting and a circuit breaker around LLM API calls
+"""
+
+import threading
+import time
+
+# Circuit breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class LLMUnavailable(Exception):
+    """The LLM call was not attempted; callers should use their fallback"""
+
+
+class CircuitOpenError(LLMUnavailable):
+    """The circuit breaker is open after repeated failures"""
+
+
+class RateLimitedError(LLMUnavailable):
+    """No rate-limit token became available in time"""
+
+
+def _is_timeout(error):
+    name = type(error).__name__
+    return isinstance(error, TimeoutError) or 'Timeout' in name or 'DeadlineExceeded' in name
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average, with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, max_wait=0.0):
+        """Take one token, waiting up to max_wait seconds; returns False if none came"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else max_wait
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def available(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class LLMClient:
+    """
+    Guards calls to an LLM API with a rate limiter and a circuit breaker
+
+    call(fn, ...) runs fn only if a rate-limit token is available within
+    max_wait seconds and the breaker allows it. After failure_threshold
+    consecutive failures (errors or timeouts) the breaker opens and every
+    call fails fast with CircuitOpenError for reset_timeout seconds. It then
+    goes half-open and lets a single probe call through: success closes the
+    breaker, failure opens it again. Limits are per process.
+
+    A caller that stops waiting on a hung call reports it with
+    record_timeout(), so slow calls trip the breaker as they miss their
+    deadlines; the outcome of a call started before the latest reported
+    timeout no longer moves the breaker when it finally arrives.
+    """
+
+    def __init__(self, rate_per_second=1.0, burst=10, max_wait=2.0, failure_threshold=5, reset_timeout=30.0):
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.max_wait = max_wait
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._last_timeout = None
+        self.stats = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'rejected_open': 0,
+            'rate_limited': 0,
+            'trips': 0
+        }
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def _trip(self, now):
+        if self._state != OPEN:
+            self.stats['trips'] += 1
+            print(f"[WARNING] LLM circuit breaker opened after {self._consecutive_failures} failures")
+        self._state = OPEN
+        self._opened_at = now
+
+    def _before_call(self):
+        """Reserve permission to call; returns True if this call is the half-open probe"""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == OPEN or (state == HALF_OPEN and self._probe_in_flight):
+                self.stats['rejected_open'] += 1
+                raise CircuitOpenError('LLM circuit breaker is open')
+            probe = state == HALF_OPEN
+            if probe:
+                self._probe_in_flight = True
+            return probe
+
+    def _after_call(self, probe, started, error=None):
+        with self._lock:
+            # Already counted by record_timeout() and superseded by later calls
+            stale = self._last_timeout is not None and started < self._last_timeout
+            if probe and not stale:
+                self._probe_in_flight = False
+
+            if error is None:
+                self.stats['successes'] += 1
+                if stale:
+                    return
+                self._consecutive_failures = 0
+                if self._state != CLOSED:
+                    print("[OK] LLM circuit breaker closed")
+                self._state = CLOSED
+                return
+
+            if stale:
+                return
+            self.stats['failures'] += 1
+            if _is_timeout(error):
+                self.stats['timeouts'] += 1
+            self._consecutive_failures += 1
+            if probe or self._consecutive_failures >= self.failure_threshold:
+                self._trip(time.monotonic())
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) under the rate limiter and circuit breaker
+
+        Raises CircuitOpenError or RateLimitedError without calling fn, or
+        re-raises fn's own exception after recording the failure.
+        """
+        probe = self._before_call()
+        if not self.bucket.acquire(self.max_wait):
+            with self._lock:
+                if probe:
+                    self._probe_in_flight = False
+                self.stats['rate_limited'] += 1
+            raise RateLimitedError('LLM rate limit reached')
+
+        with self._lock:
+            self.stats['calls'] += 1
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._after_call(probe, started, e)
+            raise
+        self._after_call(probe, started)
+        return result
+
+    def record_timeout(self):
+        """
+        Count a call its caller gave up waiting on as a failed timeout
+
+        Called when the deadline is missed rather than when the call
+        returns, so a hung client still trips the breaker.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._last_timeout = now
+            self.stats['failures'] += 1
+            self.stats['timeouts'] += 1
+            self._consecutive_failures += 1
+            if self._current_state(now) == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._probe_in_flight = False
+                self._trip(now)
+
+    def status(self):
+        """Breaker state and counters for monitoring"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            status = dict(self.stats)
+            status['state'] = state
+            status['consecutive_failures'] = self._consecutive_failures
+            status['retry_in_seconds'] = (
+                round(max(0.0, self.reset_timeout - (now - self._opened_at)), 1) if state == OPEN else 0
+            )
+        status['tokens_available'] = round(self.bucket.available(), 2)
+        return status
@@ -0,0 +1,91 @@
+"""
+Upload Load Test for Brisbane Business Bridge AI
+Fires concurrent /upload requests and reports throughput and latency percentiles
+
+Run the app against the stand-ins in mock_services.py, then e.g.:
+
+    python load_test.py sample_cv.pdf --url http://localhost:5000 --requests 200 --concurrency 16
+"""
+
+import argparse
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def encode_multipart(fields, filename, file_bytes):
+    """Build a multipart/form-data body; returns (body, content type)"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8') + file_bytes + b'\r\n'
+    )
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the /upload endpoint')
+    parser.add_argument('file', help='PDF or DOCX to upload')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--stream', action='store_true', help='use /upload/stream')
+    parser.add_argument('--unique', action='store_true',
+                        help='give every request a different name so result caches miss')
+    args = parser.parse_args()
+
+    path = Path(args.file)
+    file_bytes = path.read_bytes()
+    endpoint = f"{args.url.rstrip('/')}/upload/stream" if args.stream else f"{args.url.rstrip('/')}/upload"
+
+    def send(i):
+        name = f'Load Test {i}' if args.unique else 'Load Test'
+        body, content_type = encode_multipart(
+            {'name': name, 'company': 'Load Test Pty Ltd', 'email': 'load@example.com'},
+            path.name, file_bytes
+        )
+        request = urllib.request.Request(endpoint, data=body, headers={'Content-Type': content_type})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception as e:
+            status = type(e).__name__
+        return status, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(send, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    statuses = Counter(status for status, _ in results)
+    print(f"Requests:    {args.requests} at concurrency {args.concurrency} -> {endpoint}")
+    print(f"Statuses:    {dict(statuses)}")
+    print(f"Throughput:  {args.requests / elapsed:.1f} req/s over {elapsed:.1f}s")
+    print(f"Latency (s): p50 {percentile(latencies, 0.5):.3f}  p95 {percentile(latencies, 0.95):.3f}  "
+          f"p99 {percentile(latencies, 0.99):.3f}  max {latencies[-1]:.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Match History Store for Brisbane Business Bridge AI
+Indexed SQLite record of every match, queried by delegate, attendee, event, sector and time
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Columns that /api/matches/summary can group by
+GROUP_COLUMNS = {
+    'sector': 'sector',
+    'delegate': 'delegate_name',
+    'event': 'event',
+    'day': 'day',
+    'user': 'user_email'
+}
+
+
+class MatchHistory:
+    """
+    Embedded store of every match made, shared by all worker processes
+
+    Each row is one user-delegate match from an upload. Rows are keyed by
+    the match's idempotency key, so a retried upload is recorded once.
+    Lookups by delegate, attendee email, event, sector and day are served
+    from indexes; Notion is only a downstream copy.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS matches (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    match_key TEXT UNIQUE,
+                    created_at REAL NOT NULL,
+                    day TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    user_name TEXT NOT NULL,
+                    user_email TEXT NOT NULL,
+                    user_company TEXT,
+                    user_industry TEXT,
+                    rank INTEGER NOT NULL,
+                    score REAL NOT NULL,
+                    delegate_name TEXT NOT NULL,
+                    delegate_company TEXT,
+                    delegate_title TEXT,
+                    delegate_email TEXT,
+                    sector TEXT,
+                    synergy_analysis TEXT
+                )
+            """)
+            for name, columns in (
+                ('matches_delegate', 'delegate_name, created_at'),
+                ('matches_user', 'user_email, created_at'),
+                ('matches_event', 'event, created_at'),
+                ('matches_sector', 'sector, created_at'),
+                ('matches_day', 'day, sector'),
+                ('matches_created', 'created_at')
+            ):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON matches ({columns})")
+
+    def _connect(self):
+        """One connection per thread; WAL lets workers read while another writes"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, user_info, matches, event, keys=None, created_at=None):
+        """
+        Store an upload's ranked matches (format_match dicts); returns rows added
+
+        keys are the matches' idempotency keys; a match whose key is already
+        stored is skipped.
+        """
+        created_at = created_at or time.time()
+        day = datetime.fromtimestamp(created_at).strftime('%Y-%m-%d')
+        keys = keys or [None] * len(matches)
+        rows = [
+            (
+                key, created_at, day, event,
+                user_info['name'], user_info.get('email', '').strip().lower(),
+                user_info.get('company'), user_info.get('industry'),
+                match['rank'], match['score'],
+                match['name'], match.get('company'), match.get('title'), match.get('email'),
+                match.get('sector'), match.get('synergy_analysis')
+            )
+            for match, key in zip(matches, keys)
+        ]
+        conn = self._connect()
+        with conn:
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT OR IGNORE INTO matches (
+                    match_key, created_at, day, event, user_name, user_email, user_company, user_industry,
+                    rank, score, delegate_name, delegate_company, delegate_title, delegate_email,
+                    sector, synergy_analysis
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            return conn.total_changes - before
+
+    @staticmethod
+    def _where(delegate=None, user_email=None, event=None, sector=None, day=None, since=None, until=None):
+        """WHERE clause and parameters for the given filters (each hits an index)"""
+        clauses, params = [], []
+        for column, value in (
+            ('delegate_name', delegate),
+            ('user_email', user_email.strip().lower() if user_email else None),
+            ('event', event),
+            ('sector', sector),
+            ('day', day)
+        ):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit=100, offset=0, **filters):
+        """
+        Matches newest first, filtered by any of delegate, user_email, event,
+        sector, day ('YYYY-MM-DD'), since and until (epoch seconds)
+        """
+        where, params = self._where(**filters)
+        rows = self._connect().execute(
+            f"SELECT * FROM matches{where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        return [self._row_dict(row) for row in rows]
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        return self._connect().execute(f"SELECT COUNT(*) FROM matches{where}", params).fetchone()[0]
+
+    def summary(self, by='sector', **filters):
+        """Match and distinct-attendee counts grouped by one of GROUP_COLUMNS"""
+        column = GROUP_COLUMNS[by]
+        where, params = self._where(**filters)
+        rows = self._connect().execute(
+            f"SELECT {column} AS value, COUNT(*) AS matches, COUNT(DISTINCT user_email) AS users, "
+            f"ROUND(AVG(score), 1) AS average_score FROM matches{where} "
+            f"GROUP BY {column} ORDER BY matches DESC, value",
+            params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _row_dict(row):
+        record = dict(row)
+        record.pop('match_key', None)
+        record['created_at'] = datetime.fromtimestamp(record['created_at']).isoformat()
+        return record
+
+    def status(self):
+        try:
+            rows = self._connect().execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+        except sqlite3.Error:
+            rows = 0
+        return {
+            'matches': rows,
+            'size_bytes': os.path.getsize(self.path) if self.path.exists() else 0
+        }
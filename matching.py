@@ -0,0 +1,194 @@
+"""
+Delegate Matching Engine for Brisbane Business Bridge AI
+Precompiled sparse term matrices for scoring user profiles against delegates
+"""
+
+import numpy as np
+from scipy import sparse
+
+from automaton import PhraseAutomaton
+from delegate_table import DelegateTable
+
+# Scoring weights (see README "How It Works")
+SECTOR_SCORE = 30
+INTERESTED_SECTOR_SCORE = 10
+OBJECTIVE_KEYWORD_SCORE = 5
+OBJECTIVES_SCORE_CAP = 40
+BUSINESS_TYPE_SCORE = 20
+MAX_SCORE = 100
+
+# Objective words this short are too generic to count as a match
+MIN_OBJECTIVE_KEYWORD_LENGTH = 5
+
+# Profiles scored per matrix operation in batch matching (bounds memory)
+BATCH_CHUNK_SIZE = 256
+
+# Profile keywords that signal a fit with each delegate business type
+BUSINESS_TYPE_KEYWORDS = {
+    'investor': ['invest', 'capital', 'fund', 'equity'],
+    'funding seeker': ['seeking', 'funding', 'investment', 'capital'],
+    'service provider': ['service', 'consulting', 'consulting', 'advisory'],
+    'exporter': ['export', 'international', 'overseas']
+}
+
+
+def top_k_indices(scores, k):
+    """
+    Return the indices of the k highest scores without sorting every score
+
+    Ties are broken by index, matching a stable descending sort of the
+    full list.
+    """
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    kth_score = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth_score)
+    ties = np.flatnonzero(scores == kth_score)[:k - len(above)]
+    candidates = np.concatenate([above, ties])
+
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+class _TermMatrixBuilder:
+    """Collects (delegate, term, weight) triplets for a sparse matrix"""
+
+    def __init__(self):
+        self.rows = []
+        self.cols = []
+        self.data = []
+
+    def add(self, row, col, weight=1):
+        self.rows.append(row)
+        self.cols.append(col)
+        self.data.append(weight)
+
+    def build(self, shape):
+        # Duplicate (row, col) entries are summed, so repeated terms add up
+        return sparse.csr_matrix(
+            (np.array(self.data, dtype=np.int32), (self.rows, self.cols)),
+            shape=shape,
+            dtype=np.int32
+        )
+
+
+class DelegateIndex:
+    """
+    Sparse term index over a delegate list, built once at load time
+
+    Every phrase used for scoring (sector, interested sectors, objective
+    words, business-type keywords) is normalized and interned into a single
+    vocabulary, and each scoring rule becomes a delegates x vocabulary
+    matrix. The vocabulary is compiled into one Aho-Corasick automaton, so a
+    profile is scanned once to find every phrase it contains, and every
+    delegate is then scored with a few sparse matrix products. With the
+    default 'substring' boundary mode scores are identical to
+    simple_text_matching().
+    """
+
+    def __init__(self, delegates, boundary='substring'):
+        """
+        Args:
+            delegates: DelegateTable, or a list of delegate dicts
+            boundary: Phrase boundary mode (see automaton.BOUNDARY_MODES)
+        """
+        if not isinstance(delegates, DelegateTable):
+            delegates = DelegateTable(delegates)
+        self.delegates = delegates
+        self.boundary = boundary
+        self.vocabulary = {}
+
+        sectors = _TermMatrixBuilder()
+        objectives = _TermMatrixBuilder()
+        business_types = _TermMatrixBuilder()
+        self._compile(delegates, sectors, objectives, business_types)
+
+        shape = (len(delegates), len(self.vocabulary))
+        self.sector_matrix = sectors.build(shape)
+        self.objective_matrix = objectives.build(shape)
+        self.business_matrix = business_types.build(shape)
+        self.automaton = PhraseAutomaton(self.vocabulary, boundary=boundary)
+
+    def __len__(self):
+        return len(self.delegates)
+
+    def _intern(self, phrase):
+        """Return the vocabulary id for a normalized phrase"""
+        return self.vocabulary.setdefault(phrase, len(self.vocabulary))
+
+    def _compile(self, table, sectors, objectives, business_types):
+        """Add every delegate's weighted terms to the matrix builders"""
+        # Categorical fields are normalized once per category, not per delegate
+        sector_column = table.categorical('sector')
+        sector_terms = [self._intern(sector.lower()) for sector in sector_column.categories]
+
+        business_column = table.categorical('business_type')
+        business_terms = [
+            [self._intern(kw) for kw in set(BUSINESS_TYPE_KEYWORDS.get(business_type.lower(), ()))]
+            for business_type in business_column.categories
+        ]
+
+        interested_column = table.column('interested_sectors')
+        objectives_column = table.column('objectives')
+
+        for row in range(len(table)):
+            sectors.add(row, sector_terms[sector_column.codes[row]], SECTOR_SCORE)
+
+            for sector in interested_column[row]:
+                sectors.add(row, self._intern(sector.lower()), INTERESTED_SECTOR_SCORE)
+
+            # Repeated objective words count once per occurrence
+            for keyword in objectives_column[row].lower().split():
+                if len(keyword) >= MIN_OBJECTIVE_KEYWORD_LENGTH:
+                    objectives.add(row, self._intern(keyword))
+
+            for keyword_id in business_terms[business_column.codes[row]]:
+                business_types.add(row, keyword_id)
+
+    def find_hits(self, user_text):
+        """Return the set of vocabulary ids that occur in the profile text"""
+        return self.automaton.find_all(user_text.lower())
+
+    def hit_matrix(self, user_texts):
+        """Build a binary profiles x vocabulary matrix of phrase hits"""
+        rows, cols = [], []
+        for row, user_text in enumerate(user_texts):
+            hits = self.find_hits(user_text)
+            rows.extend([row] * len(hits))
+            cols.extend(hits)
+
+        return sparse.csr_matrix(
+            (np.ones(len(cols), dtype=np.int32), (rows, cols)),
+            shape=(len(user_texts), len(self.vocabulary)),
+            dtype=np.int32
+        )
+
+    def score_matrix(self, hits):
+        """Score a profiles x vocabulary hit matrix against every delegate"""
+        sector_points = (hits @ self.sector_matrix.T).toarray()
+        objective_hits = (hits @ self.objective_matrix.T).toarray()
+        business_hits = (hits @ self.business_matrix.T).toarray()
+
+        scores = sector_points
+        scores += np.minimum(objective_hits * OBJECTIVE_KEYWORD_SCORE, OBJECTIVES_SCORE_CAP)
+        scores += np.where(business_hits > 0, BUSINESS_TYPE_SCORE, 0).astype(np.int32)
+
+        return np.minimum(scores, MAX_SCORE)
+
+    def score_all(self, user_text):
+        """Score a profile against every delegate, in delegate order"""
+        return self.score_matrix(self.hit_matrix([user_text]))[0]
+
+    def top_k(self, user_text, k=3):
+        """Return the k best (delegate index, score) pairs for a profile"""
+        scores = self.score_all(user_text)
+        return [(int(i), int(scores[i])) for i in top_k_indices(scores, k)]
+
+    def top_k_batch(self, user_texts, k=3, chunk_size=BATCH_CHUNK_SIZE):
+        """Yield the k best (delegate index, score) pairs for each profile, in order"""
+        for start in range(0, len(user_texts), chunk_size):
+            scores = self.score_matrix(self.hit_matrix(user_texts[start:start + chunk_size]))
+            for row in scores:
+                yield [(int(i), int(row[i])) for i in top_k_indices(row, k)]
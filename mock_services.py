@@ -0,0 +1,249 @@
+"""
+Local Service Stand-ins for Brisbane Business Bridge AI
+Fake Gemini and Notion HTTP APIs with configurable latency, errors and rate limits
+
+Point the app at them for offline, repeatable load tests:
+
+    python mock_services.py gemini --port 8001 --latency-ms 800 --error-rate 0.02
+    python mock_services.py notion --port 8002 --latency-ms 150 --rate-limit-rps 3
+
+    GOOGLE_API_KEY=local GEMINI_API_ENDPOINT=http://localhost:8001
+    NOTION_TOKEN=local NOTION_DATABASE_ID=local NOTION_BASE_URL=http://localhost:8002
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm_client import TokenBucket
+
+
+class ServiceBehaviour:
+    """
+    Latency, failure and rate-limit settings shared by every request
+
+    Latency is drawn from a log-normal distribution with the given median
+    (sigma 0 = fixed latency), so tail latency can be shaped with sigma.
+    A seeded RNG keeps runs repeatable.
+    """
+
+    def __init__(self, latency_ms=0.0, latency_sigma=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 rate_limit_rps=None, retry_after=1.0, seed=None):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.bucket = TokenBucket(rate_limit_rps, max(1, int(rate_limit_rps))) if rate_limit_rps else None
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0}
+
+    def _draw(self):
+        with self._lock:
+            self.stats['requests'] += 1
+            latency = self.latency_ms
+            if self.latency_sigma:
+                latency = self._random.lognormvariate(0, self.latency_sigma) * self.latency_ms
+            return latency / 1000, self._random.random(), self._random.random()
+
+    def decide(self):
+        """Sleep for the simulated latency and return 'ok', 'error' or 'rate_limited'"""
+        latency, error_roll, limit_roll = self._draw()
+
+        if (self.bucket and not self.bucket.acquire()) or limit_roll < self.rate_limit_rate:
+            outcome = 'rate_limited'
+        else:
+            time.sleep(latency)
+            outcome = 'error' if error_roll < self.error_rate else 'ok'
+
+        with self._lock:
+            self.stats[{'ok': 'ok', 'error': 'errors', 'rate_limited': 'rate_limited'}[outcome]] += 1
+        return outcome
+
+    def status(self):
+        with self._lock:
+            return dict(self.stats)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    behaviour = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # keep load-test output readable
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        try:
+            return json.loads(body or b'{}')
+        except ValueError:
+            return {}
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._send_json(200, self.behaviour.status())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+
+class GeminiHandler(_StandInHandler):
+    """POST /v1beta/models/<model>:generateContent"""
+
+    def do_POST(self):
+        if not re.match(r'^/v1(beta)?/models/[^/:]+:generateContent', self.path):
+            self._send_json(404, {'error': {'code': 404, 'message': 'Not found', 'status': 'NOT_FOUND'}})
+            return
+
+        request = self._read_json()
+        outcome = self.behaviour.decide()
+        if outcome == 'rate_limited':
+            self._send_json(429, {'error': {'code': 429, 'message': 'Resource has been exhausted',
+                                            'status': 'RESOURCE_EXHAUSTED'}})
+            return
+        if outcome == 'error':
+            self._send_json(500, {'error': {'code': 500, 'message': 'Internal error', 'status': 'INTERNAL'}})
+            return
+
+        prompt = ''.join(
+            part.get('text', '')
+            for content in request.get('contents', [])
+            for part in content.get('parts', [])
+        )
+        text = self._analysis_text(prompt)
+        self._send_json(200, {
+            'candidates': [{
+                'content': {'parts': [{'text': text}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0
+            }],
+            'usageMetadata': {
+                'promptTokenCount': len(prompt) // 4,
+                'candidatesTokenCount': len(text) // 4,
+                'totalTokenCount': (len(prompt) + len(text)) // 4
+            }
+        })
+
+    @staticmethod
+    def _analysis_text(prompt):
+        """Canned analysis; a JSON array when the batched synergy prompt asks for one"""
+        names = re.findall(r'^DELEGATE[^\n]*:\nName: (.+)$', prompt, re.MULTILINE)
+        body = ("**Alignment Areas:**\n- Shared sector focus\n\n"
+                "**Collaboration Opportunities:**\n- Joint projects in Brisbane\n\n"
+                "**Recommended Talking Points:**\n1. Current priorities\n2. Partnership models\n\n"
+                "**Next Steps:**\n- Book a meeting at the event")
+        if 'JSON array' in prompt:
+            return json.dumps([
+                {'delegate': i, 'analysis': f"Synergy with {name}\n\n{body}"}
+                for i, name in enumerate(names, 1)
+            ])
+        return f"Synergy with {names[0] if names else 'delegate'}\n\n{body}"
+
+
+class NotionHandler(_StandInHandler):
+    """POST /v1/pages and POST /v1/databases/<id>/query"""
+
+    def do_POST(self):
+        if self.path.rstrip('/') not in ('/v1/pages',) and not re.match(r'^/v1/databases/[^/]+/query', self.path):
+            self._send_json(404, {'object': 'error', 'status': 404, 'code': 'object_not_found',
+                                  'message': 'Not found'})
+            return
+
+        request = self._read_json()
+        outcome = self.behaviour.decide()
+        if outcome == 'rate_limited':
+            self._send_json(
+                429,
+                {'object': 'error', 'status': 429, 'code': 'rate_limited',
+                 'message': 'You have been rate limited. Please try again in a few minutes.'},
+                headers={'Retry-After': f"{self.behaviour.retry_after:g}"}
+            )
+            return
+        if outcome == 'error':
+            self._send_json(503, {'object': 'error', 'status': 503, 'code': 'service_unavailable',
+                                  'message': 'Notion is unavailable'})
+            return
+
+        if self.path.startswith('/v1/databases/'):
+            self._send_json(200, {'object': 'list', 'results': [], 'next_cursor': None, 'has_more': False})
+            return
+
+        now = datetime.now(timezone.utc).isoformat()
+        self._send_json(200, {
+            'object': 'page',
+            'id': str(uuid.uuid4()),
+            'created_time': now,
+            'last_edited_time': now,
+            'parent': request.get('parent', {}),
+            'properties': request.get('properties', {})
+        })
+
+
+HANDLERS = {'gemini': GeminiHandler, 'notion': NotionHandler}
+
+
+def make_server(service, behaviour, host='127.0.0.1', port=0):
+    """Create (but don't start) a stand-in server; port 0 picks a free port"""
+    handler = type(f'{service.title()}StandIn', (HANDLERS[service],), {'behaviour': behaviour})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local Gemini or Notion stand-in')
+    parser.add_argument('service', choices=sorted(HANDLERS))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='median response latency')
+    parser.add_argument('--latency-sigma', type=float, default=0.0,
+                        help='log-normal spread of latency (0 = fixed)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests that fail')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help='fraction of requests answered with 429')
+    parser.add_argument('--rate-limit-rps', type=float, default=None,
+                        help='answer 429 above this many requests per second')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds on Notion 429s')
+    parser.add_argument('--seed', type=int, default=None, help='random seed for repeatable runs')
+    args = parser.parse_args()
+
+    behaviour = ServiceBehaviour(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        rate_limit_rps=args.rate_limit_rps,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    server = make_server(args.service, behaviour, args.host, args.port)
+    print(f"[MOCK] {args.service} stand-in listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"[MOCK] {args.service} stats: {behaviour.status()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,478 @@
+"""
+Notion Write-Behind Queue for Brisbane Business Bridge AI
+Durable SQLite spool of pending Notion writes, drained in the background with retries
+"""
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+# Job states
+PENDING = 'pending'
+DONE = 'done'
+DEAD = 'dead'
+
+# HTTP statuses that will fail the same way on every retry
+PERMANENT_STATUSES = (400, 401, 403, 404)
+
+
+# Window for the drain-rate metric
+DRAIN_RATE_WINDOW = 60
+
+
+def is_permanent_error(error):
+    """True for errors that retrying cannot fix (bad request, auth, missing database)"""
+    return getattr(error, 'status', None) in PERMANENT_STATUSES
+
+
+def retry_after_seconds(error, default=1.0):
+    """Seconds to back off after a 429, from its Retry-After header; None if not a 429"""
+    if getattr(error, 'status', None) != 429:
+        return None
+    value = (getattr(error, 'headers', None) or {}).get('retry-after')
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+def payload_key(payload):
+    """Stable key for a payload, so identical pending writes coalesce"""
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class RateGovernor:
+    """
+    Request pacing shared by every process using the same SQLite file
+
+    Each acquire() reserves the next free send slot (one every 1/rate
+    seconds) in a single-row table, so all gunicorn workers together stay
+    under the rate. pause() pushes every worker's next slot past a
+    Retry-After deadline.
+    """
+
+    def __init__(self, path, rate_per_second):
+        self.path = Path(path)
+        self.interval = 1.0 / rate_per_second
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS governor (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                next_slot_at REAL NOT NULL,
+                paused_until REAL NOT NULL
+            )
+        """)
+        conn.execute("INSERT OR IGNORE INTO governor (id, next_slot_at, paused_until) VALUES (1, 0, 0)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _reserve(self):
+        """Claim the next slot; returns (seconds to wait, paused_until)"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            next_slot_at, paused_until = conn.execute(
+                "SELECT next_slot_at, paused_until FROM governor WHERE id = 1"
+            ).fetchone()
+            slot = max(now, next_slot_at, paused_until)
+            conn.execute("UPDATE governor SET next_slot_at = ? WHERE id = 1", (slot + self.interval,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return slot - now
+
+    def acquire(self, stop_event=None):
+        """Block until this process may send; returns False if stop_event was set first"""
+        stop_event = stop_event or threading.Event()
+        while True:
+            wait = self._reserve()
+            if wait > 0 and stop_event.wait(wait):
+                return False
+            # A 429 elsewhere may have paused everyone while we waited for our slot
+            if self.paused_for() <= 0:
+                return True
+
+    def pause(self, seconds):
+        """Hold every worker's sends for `seconds` (e.g. a Retry-After)"""
+        self._connect().execute(
+            "UPDATE governor SET paused_until = max(paused_until, ?) WHERE id = 1", (time.time() + seconds,)
+        )
+
+    def paused_for(self):
+        paused_until = self._connect().execute("SELECT paused_until FROM governor WHERE id = 1").fetchone()[0]
+        return max(0.0, paused_until - time.time())
+
+    def status(self):
+        next_slot_at, paused_until = self._connect().execute(
+            "SELECT next_slot_at, paused_until FROM governor WHERE id = 1"
+        ).fetchone()
+        now = time.time()
+        return {
+            'rate_per_second': round(1.0 / self.interval, 2),
+            'next_slot_in_seconds': round(max(0.0, next_slot_at - now), 2),
+            'paused_for_seconds': round(max(0.0, paused_until - now), 2)
+        }
+
+
+class NotionWriteQueue:
+    """
+    Write-behind queue for Notion page writes, persisted in SQLite
+
+    enqueue() stores the write and returns immediately; a daemon thread
+    sends queued writes with writer(payload). Failed writes are retried
+    with exponential backoff and jitter, up to max_attempts, then marked
+    dead and kept for inspection. Jobs stay in the spool across restarts,
+    and several worker processes can drain the same spool: each job is
+    leased to one process at a time, and a lease that expires (the process
+    died mid-write) makes the job available again, so delivery is
+    at-least-once.
+
+    Each write has a key (an idempotency key, or a hash of the payload).
+    Keys of delivered writes are kept in a local index for keep_keys_seconds:
+    enqueueing or sending a write whose key is already there is a no-op,
+    and enqueueing one whose key matches a still-pending job replaces that
+    job's payload instead of adding a row. If a job may already have reached
+    Notion (an earlier attempt failed or its lease expired mid-write), the
+    optional already_written(payload) check runs before it is resent. With rate_per_second set, due
+    jobs are claimed batch_size at a time and sent through a RateGovernor
+    shared by every process on the spool; a 429 pauses all of them for its
+    Retry-After and does not count as a failed attempt.
+    """
+
+    def __init__(self, path, writer, max_attempts=8, base_delay=2.0, max_delay=300.0,
+                 lease_seconds=60.0, poll_interval=1.0, keep_done_seconds=24 * 3600,
+                 rate_per_second=None, batch_size=10, already_written=None,
+                 keep_keys_seconds=90 * 24 * 3600):
+        self.path = Path(path)
+        self.writer = writer
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.keep_done_seconds = keep_done_seconds
+        self.batch_size = batch_size
+        self.already_written = already_written
+        self.keep_keys_seconds = keep_keys_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._owner = f"{os.getpid()}-{id(self)}"
+
+        self._stats_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'coalesced': 0, 'sent': 0, 'retries': 0, 'rate_limited': 0, 'dead': 0,
+                      'duplicates': 0}
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires_at REAL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'coalesce_key' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN coalesce_key TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, next_attempt_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (status, updated_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_coalesce ON jobs (coalesce_key, status)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sent_keys (
+                    key TEXT PRIMARY KEY,
+                    job_id INTEGER NOT NULL,
+                    sent_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS sent_keys_age ON sent_keys (sent_at)")
+
+        self.governor = RateGovernor(self.path, rate_per_second) if rate_per_second else None
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def enqueue(self, payload, key=None):
+        """
+        Durably queue one write; returns the job id
+
+        If a write with the same key (by default, an identical payload) was
+        already delivered, nothing is queued and that job's id is returned.
+        A pending, unleased job with the same key is updated in place rather
+        than queued twice.
+        """
+        key = key or payload_key(payload)
+        encoded = json.dumps(payload, ensure_ascii=False)
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            sent = conn.execute("SELECT job_id FROM sent_keys WHERE key = ?", (key,)).fetchone()
+            if sent is not None:
+                conn.execute("COMMIT")
+                self._count('duplicates')
+                return sent[0]
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE coalesce_key = ? AND status = ? "
+                "AND (lease_expires_at IS NULL OR lease_expires_at < ?) LIMIT 1",
+                (key, PENDING, now)
+            ).fetchone()
+            if row is not None:
+                job_id = row[0]
+                conn.execute("UPDATE jobs SET payload = ?, updated_at = ? WHERE id = ?", (encoded, now, job_id))
+            else:
+                job_id = conn.execute(
+                    "INSERT INTO jobs (payload, coalesce_key, next_attempt_at, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (encoded, key, now, now, now)
+                ).lastrowid
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._count('coalesced' if row is not None else 'enqueued')
+        self._wake.set()
+        return job_id
+
+    def _claim(self, limit=1):
+        """
+        Lease up to `limit` of the oldest due jobs to this process
+
+        Returns [(id, payload, attempts, key, uncertain)], where uncertain
+        means an earlier attempt may have reached Notion despite failing.
+        """
+        now = time.time()
+        # Paced sends take a while, so the lease covers the whole batch
+        lease = self.lease_seconds + (limit * self.governor.interval if self.governor else 0)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT id, payload, attempts, coalesce_key, lease_owner FROM jobs "
+                "WHERE status = ? AND next_attempt_at <= ? AND (lease_expires_at IS NULL OR lease_expires_at < ?) "
+                "ORDER BY next_attempt_at, id LIMIT ?",
+                (PENDING, now, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET lease_owner = ?, lease_expires_at = ? WHERE id = ?",
+                [(self._owner, now + lease, row[0]) for row in rows]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        # A job still carrying a lease here was abandoned mid-write
+        return [(row[0], json.loads(row[1]), row[2], row[3], row[2] > 0 or row[4] is not None) for row in rows]
+
+    def _release(self, job_ids):
+        """Give back leased jobs that were not attempted"""
+        self._connect().executemany(
+            "UPDATE jobs SET lease_owner = NULL, lease_expires_at = NULL WHERE id = ? AND lease_owner = ?",
+            [(job_id, self._owner) for job_id in job_ids]
+        )
+
+    def _backoff(self, attempts):
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _finish(self, job_id, error=None, attempts=0, key=None):
+        now = time.time()
+        conn = self._connect()
+        retry_after = retry_after_seconds(error, self.base_delay) if error is not None else None
+        if retry_after is not None:
+            # Rate limited: back off as told, without using up an attempt
+            conn.execute(
+                "UPDATE jobs SET attempts = ?, next_attempt_at = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "last_error = ?, updated_at = ? WHERE id = ?",
+                (attempts - 1, now + retry_after, str(error), now, job_id)
+            )
+            self._count('rate_limited')
+            print(f"[WARNING] Notion rate limited; pausing writes for {retry_after:.1f}s")
+            return retry_after
+
+        if error is None:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                    "last_error = NULL, updated_at = ? WHERE id = ?",
+                    (DONE, attempts, now, job_id)
+                )
+                if key:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO sent_keys (key, job_id, sent_at) VALUES (?, ?, ?)", (key, job_id, now)
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return
+
+        if attempts >= self.max_attempts or is_permanent_error(error):
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "last_error = ?, updated_at = ? WHERE id = ?",
+                (DEAD, attempts, str(error), now, job_id)
+            )
+            self._count('dead')
+            print(f"[ERROR] Notion write {job_id} failed permanently after {attempts} attempts: {error}")
+            return
+
+        conn.execute(
+            "UPDATE jobs SET attempts = ?, next_attempt_at = ?, lease_owner = NULL, lease_expires_at = NULL, "
+            "last_error = ?, updated_at = ? WHERE id = ?",
+            (attempts, now + self._backoff(attempts), str(error), now, job_id)
+        )
+        self._count('retries')
+        print(f"[WARNING] Notion write {job_id} failed (attempt {attempts}), will retry: {error}")
+
+    def _is_sent(self, key):
+        return key is not None and self._connect().execute(
+            "SELECT 1 FROM sent_keys WHERE key = ?", (key,)
+        ).fetchone() is not None
+
+    def _send(self, job):
+        """Deliver one leased job; returns a Retry-After delay if Notion rate limited it"""
+        job_id, payload, attempts, key, uncertain = job
+        if self._is_sent(key):
+            # Another job with this key got there first (e.g. a replayed lease)
+            self._finish(job_id, attempts=attempts, key=key)
+            self._count('duplicates')
+            return None
+
+        try:
+            if uncertain and self.already_written:
+                if self.already_written(payload):
+                    self._finish(job_id, attempts=attempts, key=key)
+                    self._count('duplicates')
+                    return None
+                # The check used up this send slot
+                if self.governor and not self.governor.acquire(self._stop):
+                    self._release([job_id])
+                    return None
+            self.writer(payload)
+        except Exception as e:
+            return self._finish(job_id, error=e, attempts=attempts + 1)
+        self._finish(job_id, attempts=attempts + 1, key=key)
+        self._count('sent')
+        return None
+
+    def drain_once(self):
+        """Send every currently due job, batch by batch; returns how many were attempted"""
+        attempted = 0
+        while not self._stop.is_set():
+            batch = self._claim(self.batch_size if self.governor else 1)
+            if not batch:
+                break
+            for index, job in enumerate(batch):
+                if self.governor and not self.governor.acquire(self._stop):
+                    self._release([job[0] for job in batch[index:]])
+                    return attempted
+                attempted += 1
+                retry_after = self._send(job)
+                if retry_after is not None:
+                    if self.governor:
+                        self.governor.pause(retry_after)
+                    self._release([job[0] for job in batch[index + 1:]])
+                    break
+        return attempted
+
+    def purge(self):
+        """Delete delivered jobs older than keep_done_seconds and keys older than keep_keys_seconds"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("DELETE FROM jobs WHERE status = ? AND updated_at < ?", (DONE, now - self.keep_done_seconds))
+        conn.execute("DELETE FROM sent_keys WHERE sent_at < ?", (now - self.keep_keys_seconds,))
+
+    def start(self):
+        """Drain the spool on a daemon thread (pending jobs from a previous run go first)"""
+        if self._thread is not None:
+            return
+
+        def run():
+            last_purge = 0.0
+            while not self._stop.is_set():
+                try:
+                    self.drain_once()
+                    if time.time() - last_purge > 3600:
+                        self.purge()
+                        last_purge = time.time()
+                except sqlite3.Error as e:
+                    print(f"[WARNING] Notion spool error: {e}")
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=run, name='notion-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def status(self):
+        """Backlog depth and drain rate (all processes) and this process's counters"""
+        now = time.time()
+        conn = self._connect()
+        counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        oldest = conn.execute(
+            "SELECT MIN(created_at) FROM jobs WHERE status = ?", (PENDING,)
+        ).fetchone()[0]
+        recently_sent = conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND updated_at >= ?", (DONE, now - DRAIN_RATE_WINDOW)
+        ).fetchone()[0]
+        keys_indexed = conn.execute("SELECT COUNT(*) FROM sent_keys").fetchone()[0]
+        with self._stats_lock:
+            status = dict(self.stats)
+        drain_rate = recently_sent / DRAIN_RATE_WINDOW
+        status.update({
+            'pending': counts.get(PENDING, 0),
+            'dead_total': counts.get(DEAD, 0),
+            'keys_indexed': keys_indexed,
+            'oldest_pending_seconds': round(now - oldest, 1) if oldest else 0,
+            'drain_rate_per_second': round(drain_rate, 2),
+            'estimated_drain_seconds': round(counts.get(PENDING, 0) / drain_rate, 1) if drain_rate else None,
+            'governor': self.governor.status() if self.governor else None
+        })
+        return status
@@ -11,130 +11,103 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 from reportlab.pdfgen import canvas
 from datetime import datetime
+from functools import lru_cache
+import copy
 import io
 
 
-def generate_match_report_pdf(user_info, matches):
-    """
-    Generate a PDF report for delegate matches
+# Closing advice printed after the matches
+NEXT_STEPS = [
+    "1. Review the synergy analysis for each match to identify collaboration opportunities",
+    "2. Reach out to delegates via email to introduce yourself and your organization",
+    "3. Schedule meetings during the Boldly Brisbane Forum or APCS 2025 events",
+    "4. Prepare talking points based on the recommended topics in each analysis",
+    "5. Follow up with Brisbane City Council for additional delegate introductions"
+]
 
-    Args:
-        user_info: Dictionary with user information
-        matches: List of top 3 match dictionaries
 
-    Returns:
-        BytesIO buffer containing the PDF
+def format_markdown_line(line):
+    """Convert **bold** markdown in one analysis line to reportlab markup"""
+    formatted_line = line
+    # Replace ** pairs with proper <b> tags
+    if formatted_line.count('**') >= 2:
+        # Replace first ** with <b>, second with </b>, and so on
+        parts = formatted_line.split('**')
+        formatted_line = ''
+        for i, part in enumerate(parts):
+            if i % 2 == 0:
+                formatted_line += part
+            else:
+                formatted_line += f'<b>{part}</b>'
+
+    # Escape any remaining special characters
+    return formatted_line.replace('&', '&amp;')
+
+
+class MatchReportTemplate:
     """
-    try:
-        buffer = io.BytesIO()
-    except Exception as e:
-        print(f"[PDF ERROR] Failed to create buffer: {e}")
-        raise
-
-    # Create PDF document
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=50,
-        leftMargin=50,
-        topMargin=50,
-        bottomMargin=50
-    )
-
-    # Container for elements
-    elements = []
-
-    # Get styles
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#0066CC'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#003366'),
-        spaceAfter=12,
-        spaceBefore=20,
-        fontName='Helvetica-Bold'
-    )
-
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#333333'),
-        spaceAfter=12,
-        leading=16
-    )
-
-    small_style = ParagraphStyle(
-        'Small',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor('#666666'),
-        alignment=TA_CENTER
-    )
-
-    # Header
-    elements.append(Paragraph("Brisbane Business Bridge AI", title_style))
-    elements.append(Paragraph("Delegate Matching Report", heading_style))
-
-    # Date
-    report_date = datetime.now().strftime("%B %d, %Y")
-    elements.append(Paragraph(f"Generated: {report_date}", small_style))
-    elements.append(Spacer(1, 0.3*inch))
-
-    # Horizontal line
-    elements.append(Spacer(1, 0.1*inch))
-
-    # User Information Section
-    elements.append(Paragraph("Participant Information", heading_style))
-
-    user_data = [
-        ["Name:", user_info.get('name', 'N/A')],
-        ["Company:", user_info.get('company', 'N/A')],
-        ["Email:", user_info.get('email', 'N/A')],
-        ["Industry:", user_info.get('industry', 'N/A') if user_info.get('industry') else 'Not specified'],
-    ]
-
-    user_table = Table(user_data, colWidths=[1.5*inch, 4*inch])
-    user_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#0066CC')),
-        ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#333333')),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-    ]))
-
-    elements.append(user_table)
-    elements.append(Spacer(1, 0.4*inch))
-
-    # Top Matches Section
-    elements.append(Paragraph("Your Top 3 Brisbane Delegate Matches", heading_style))
-    elements.append(Spacer(1, 0.2*inch))
-
-    # Generate match cards
-    for i, match in enumerate(matches, 1):
-        # Match header box with rank and score
-        match_header_data = [[
-            f"RANK #{match['rank']}",
-            f"{match['score']}% MATCH"
-        ]]
+    Styles and fixed content of the match report, built once per process
+
+    Paragraph styles, table styles and the report's static paragraphs
+    (headings, next steps, footer) are created here once; render() only
+    builds the participant- and match-specific flowables. Static paragraphs,
+    and recently seen synergy-analysis lines, are kept as parsed prototypes
+    and shallow-copied into each report, so concurrent renders never share
+    layout state.
+    """
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+
+        # Custom styles
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#0066CC'),
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        )
+
+        self.heading_style = ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=16,
+            textColor=colors.HexColor('#003366'),
+            spaceAfter=12,
+            spaceBefore=20,
+            fontName='Helvetica-Bold'
+        )
+
+        self.body_style = ParagraphStyle(
+            'CustomBody',
+            parent=styles['Normal'],
+            fontSize=11,
+            textColor=colors.HexColor('#333333'),
+            spaceAfter=12,
+            leading=16
+        )
+
+        self.small_style = ParagraphStyle(
+            'Small',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.HexColor('#666666'),
+            alignment=TA_CENTER
+        )
+
+        self.user_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#0066CC')),
+            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#333333')),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ])
 
-        match_header_table = Table(match_header_data, colWidths=[4*inch, 2*inch])
-        match_header_table.setStyle(TableStyle([
+        self.match_header_table_style = TableStyle([
             ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#0066CC')),
             ('BACKGROUND', (1, 0), (1, 0), colors.HexColor('#00CC66')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -146,22 +119,9 @@ def generate_match_report_pdf(user_info, matches):
             ('RIGHTPADDING', (0, 0), (-1, -1), 12),
             ('TOPPADDING', (0, 0), (-1, -1), 8),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        ])
 
-        elements.append(match_header_table)
-
-        # Delegate information
-        delegate_info_data = [
-            ["Name:", match['name']],
-            ["Title:", match['title']],
-            ["Company:", match['company']],
-            ["Sector:", match['sector']],
-            ["Email:", match['email']],
-            ["Phone:", match['phone']],
-        ]
-
-        delegate_info_table = Table(delegate_info_data, colWidths=[1.2*inch, 4.8*inch])
-        delegate_info_table.setStyle(TableStyle([
+        self.delegate_table_style = TableStyle([
             ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
             ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
             ('FONTSIZE', (0, 0), (-1, -1), 10),
@@ -174,97 +134,165 @@ def generate_match_report_pdf(user_info, matches):
             ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
             ('LINEABOVE', (0, 0), (-1, 0), 1, colors.HexColor('#CCCCCC')),
             ('LINEBELOW', (0, -1), (-1, -1), 1, colors.HexColor('#CCCCCC')),
-        ]))
+        ])
+
+        # Static paragraphs, parsed once
+        self._title = Paragraph("Brisbane Business Bridge AI", self.title_style)
+        self._subtitle = Paragraph("Delegate Matching Report", self.heading_style)
+        self._participant_heading = Paragraph("Participant Information", self.heading_style)
+        self._matches_heading = Paragraph("Your Top 3 Brisbane Delegate Matches", self.heading_style)
+        self._objectives_label = Paragraph("<b>Delegate Objectives:</b>", self.body_style)
+        self._synergy_heading = Paragraph("<b>AI Synergy Analysis:</b>", self.heading_style)
+        self._next_steps_heading = Paragraph("<b>Next Steps:</b>", self.heading_style)
+        self._next_steps = [Paragraph(step, self.body_style) for step in NEXT_STEPS]
+        self._footers = {}
+        # Analysis lines repeat across reports (section headings, cached or template analyses)
+        self._analysis_paragraph = lru_cache(maxsize=2048)(self._parse_analysis_line)
+
+    def _footer(self, year):
+        """Footer paragraph for the given copyright year (cached)"""
+        footer = self._footers.get(year)
+        if footer is None:
+            footer_text = f"""
+    <para align=center>
+    <b>Brisbane Business Bridge AI</b><br/>
+    Powered by Rico Engineering Services RES FZ-LLC<br/>
+    <font size=8 color="#666666">
+    Connecting Cities, Empowering Business<br/>
+    © {year} Rico Engineering Services. All Rights Reserved.<br/>
+    For Brisbane City Council - Boldly Brisbane Forum & APCS 2025
+    </font>
+    </para>
+    """
+            footer = self._footers[year] = Paragraph(footer_text, self.small_style)
+        return copy.copy(footer)
+
+    def _parse_analysis_line(self, line):
+        try:
+            return Paragraph(format_markdown_line(line), self.body_style)
+        except Exception:
+            # Fallback: add as plain text without formatting
+            print(f"[PDF WARNING] Could not format line, using plain text: {line[:50]}")
+            plain_line = line.replace('**', '').replace('<', '').replace('>', '')
+            return Paragraph(plain_line, self.body_style)
+
+    def _match_elements(self, match):
+        """Flowables for one match card"""
+        elements = []
 
+        # Match header box with rank and score
+        match_header_table = Table([[
+            f"RANK #{match['rank']}",
+            f"{match['score']}% MATCH"
+        ]], colWidths=[4*inch, 2*inch])
+        match_header_table.setStyle(self.match_header_table_style)
+        elements.append(match_header_table)
+
+        # Delegate information
+        delegate_info_data = [
+            ["Name:", match['name']],
+            ["Title:", match['title']],
+            ["Company:", match['company']],
+            ["Sector:", match['sector']],
+            ["Email:", match['email']],
+            ["Phone:", match['phone']],
+        ]
+        delegate_info_table = Table(delegate_info_data, colWidths=[1.2*inch, 4.8*inch])
+        delegate_info_table.setStyle(self.delegate_table_style)
         elements.append(delegate_info_table)
         elements.append(Spacer(1, 0.15*inch))
 
         # Objectives
-        elements.append(Paragraph("<b>Delegate Objectives:</b>", body_style))
+        elements.append(copy.copy(self._objectives_label))
         objectives_text = match['objectives'][:300] + "..." if len(match['objectives']) > 300 else match['objectives']
-        elements.append(Paragraph(objectives_text, body_style))
+        elements.append(Paragraph(objectives_text, self.body_style))
         elements.append(Spacer(1, 0.1*inch))
 
         # Interested Sectors
         interested_sectors = ", ".join(match['interested_sectors'][:3])
-        elements.append(Paragraph(f"<b>Interested Sectors:</b> {interested_sectors}", body_style))
+        elements.append(Paragraph(f"<b>Interested Sectors:</b> {interested_sectors}", self.body_style))
         elements.append(Spacer(1, 0.15*inch))
 
-        # Synergy Analysis
-        elements.append(Paragraph("<b>AI Synergy Analysis:</b>", heading_style))
-
-        # Parse and format the synergy analysis (it's in markdown format)
-        synergy_lines = match['synergy_analysis'].split('\n')
-        for line in synergy_lines:
+        # Synergy Analysis (markdown)
+        elements.append(copy.copy(self._synergy_heading))
+        for line in match['synergy_analysis'].split('\n'):
             if line.strip():
-                # Convert markdown bold to reportlab bold (proper handling)
-                formatted_line = line
-                # Replace ** pairs with proper <b> tags
-                bold_count = formatted_line.count('**')
-                if bold_count >= 2:
-                    # Replace first ** with <b>, second with </b>, and so on
-                    parts = formatted_line.split('**')
-                    formatted_line = ''
-                    for i, part in enumerate(parts):
-                        if i % 2 == 0:
-                            formatted_line += part
-                        else:
-                            formatted_line += f'<b>{part}</b>'
-
-                # Escape any remaining special characters
-                formatted_line = formatted_line.replace('&', '&amp;')
-
-                try:
-                    elements.append(Paragraph(formatted_line, body_style))
-                except Exception as e:
-                    # Fallback: add as plain text without formatting
-                    print(f"[PDF WARNING] Could not format line, using plain text: {line[:50]}")
-                    plain_line = line.replace('**', '').replace('<', '').replace('>', '')
-                    elements.append(Paragraph(plain_line, body_style))
-
-        # Add page break between matches (except for the last one)
-        if i < len(matches):
-            elements.append(Spacer(1, 0.3*inch))
-            elements.append(PageBreak())
-
-    # Footer section
-    elements.append(Spacer(1, 0.5*inch))
-    elements.append(Paragraph(
-        "<b>Next Steps:</b>",
-        heading_style
-    ))
-
-    next_steps = [
-        "1. Review the synergy analysis for each match to identify collaboration opportunities",
-        "2. Reach out to delegates via email to introduce yourself and your organization",
-        "3. Schedule meetings during the Boldly Brisbane Forum or APCS 2025 events",
-        "4. Prepare talking points based on the recommended topics in each analysis",
-        "5. Follow up with Brisbane City Council for additional delegate introductions"
-    ]
-
-    for step in next_steps:
-        elements.append(Paragraph(step, body_style))
-
-    elements.append(Spacer(1, 0.4*inch))
-
-    # Footer
-    footer_text = f"""
-    <para align=center>
-    <b>Brisbane Business Bridge AI</b><br/>
-    Powered by Rico Engineering Services RES FZ-LLC<br/>
-    <font size=8 color="#666666">
-    Connecting Cities, Empowering Business<br/>
-    © {datetime.now().year} Rico Engineering Services. All Rights Reserved.<br/>
-    For Brisbane City Council - Boldly Brisbane Forum & APCS 2025
-    </font>
-    </para>
-    """
+                elements.append(copy.copy(self._analysis_paragraph(line)))
 
-    elements.append(Paragraph(footer_text, small_style))
+        return elements
+
+    def render(self, user_info, matches):
+        """Build the report for one participant; returns a BytesIO buffer containing the PDF"""
+        buffer = io.BytesIO()
+
+        # Create PDF document
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            rightMargin=50,
+            leftMargin=50,
+            topMargin=50,
+            bottomMargin=50
+        )
+
+        # Header
+        now = datetime.now()
+        elements = [copy.copy(self._title), copy.copy(self._subtitle)]
+        elements.append(Paragraph(f"Generated: {now.strftime('%B %d, %Y')}", self.small_style))
+        elements.append(Spacer(1, 0.3*inch))
+        elements.append(Spacer(1, 0.1*inch))
+
+        # User Information Section
+        elements.append(copy.copy(self._participant_heading))
+        user_table = Table([
+            ["Name:", user_info.get('name', 'N/A')],
+            ["Company:", user_info.get('company', 'N/A')],
+            ["Email:", user_info.get('email', 'N/A')],
+            ["Industry:", user_info.get('industry', 'N/A') if user_info.get('industry') else 'Not specified'],
+        ], colWidths=[1.5*inch, 4*inch])
+        user_table.setStyle(self.user_table_style)
+        elements.append(user_table)
+        elements.append(Spacer(1, 0.4*inch))
+
+        # Top Matches Section
+        elements.append(copy.copy(self._matches_heading))
+        elements.append(Spacer(1, 0.2*inch))
+
+        for i, match in enumerate(matches, 1):
+            elements.extend(self._match_elements(match))
+            # Add page break between matches (except for the last one)
+            if i < len(matches):
+                elements.append(Spacer(1, 0.3*inch))
+                elements.append(PageBreak())
+
+        # Footer section
+        elements.append(Spacer(1, 0.5*inch))
+        elements.append(copy.copy(self._next_steps_heading))
+        elements.extend(copy.copy(step) for step in self._next_steps)
+        elements.append(Spacer(1, 0.4*inch))
+        elements.append(self._footer(now.year))
+
+        # Build PDF
+        doc.build(elements)
+
+        # Get PDF bytes
+        buffer.seek(0)
+        return buffer
+
+
+# Shared by every report generated in this process
+REPORT_TEMPLATE = MatchReportTemplate()
 
-    # Build PDF
-    doc.build(elements)
 
-    # Get PDF bytes
-    buffer.seek(0)
-    return buffer
+def generate_match_report_pdf(user_info, matches):
+    """
+    Generate a PDF report for delegate matches
+
+    Args:
+        user_info: Dictionary with user information
+        matches: List of top 3 match dictionaries
+
+    Returns:
+        BytesIO buffer containing the PDF
+    """
+    return REPORT_TEMPLATE.render(user_info, matches)
@@ -0,0 +1,173 @@
+"""
+Result Cache for Brisbane Business Bridge AI
+Content-addressed SQLite cache for extracted text, match lists and synergy analyses
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Default cache sections: one per pipeline stage
+NAMESPACES = ('extraction', 'matches', 'synergy')
+
+# Evict expired and least recently used entries every this many writes
+EVICT_EVERY = 50
+
+
+def content_hash(data):
+    """SHA-256 of raw bytes (e.g. an uploaded file)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_profile_text(text):
+    """Profile text with case and runs of spaces/blank lines folded, for cache keys"""
+    text = re.sub(r'[ \t]+', ' ', text.lower())
+    return re.sub(r'\s*\n\s*', '\n', text).strip()
+
+
+def cache_key(*parts):
+    """Hash any JSON-serializable key parts into a fixed-length key"""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent LRU/TTL cache shared by every worker process
+
+    Values are JSON documents stored in SQLite under (namespace, key).
+    Entries older than ttl_seconds are ignored and removed; when the cache
+    holds more than max_entries, the least recently read entries are
+    evicted first. Cache failures are logged and treated as misses, so a
+    broken cache never fails a request.
+    """
+
+    def __init__(self, path, max_entries=5000, ttl_seconds=7 * 24 * 3600, namespaces=NAMESPACES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {namespace: {'hits': 0, 'misses': 0} for namespace in namespaces}
+        self._writes = 0
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    def _connect(self):
+        """One connection per thread; WAL lets workers read while another writes"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, namespace, outcome):
+        with self._stats_lock:
+            self._stats.setdefault(namespace, {'hits': 0, 'misses': 0})[outcome] += 1
+
+    def get(self, namespace, key):
+        """Return the cached value, or None on a miss"""
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value FROM entries WHERE namespace = ? AND key = ? AND created_at >= ?",
+                    (namespace, key, now - self.ttl_seconds)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                        (now, namespace, key)
+                    )
+        except sqlite3.Error as e:
+            print(f"[WARNING] Result cache read failed: {e}")
+            row = None
+
+        if row is None:
+            self._count(namespace, 'misses')
+            return None
+        self._count(namespace, 'hits')
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value):
+        """Store a JSON-serializable value"""
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (namespace, key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, json.dumps(value, ensure_ascii=False), now, now)
+                )
+        except sqlite3.Error as e:
+            print(f"[WARNING] Result cache write failed: {e}")
+            return
+
+        with self._stats_lock:
+            self._writes += 1
+            evict = self._writes % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        try:
+            with self._connect() as conn:
+                expired = conn.execute(
+                    "DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+                overflow = conn.execute(
+                    "DELETE FROM entries WHERE rowid IN ("
+                    "SELECT rowid FROM entries ORDER BY accessed_at "
+                    "LIMIT max(0, (SELECT COUNT(*) FROM entries) - ?))",
+                    (self.max_entries,)
+                ).rowcount
+        except sqlite3.Error as e:
+            print(f"[WARNING] Result cache eviction failed: {e}")
+            return 0
+        return expired + overflow
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def status(self):
+        """Entry counts and hit/miss counters (this process) per namespace"""
+        try:
+            with self._connect() as conn:
+                rows = conn.execute("SELECT namespace, COUNT(*) FROM entries GROUP BY namespace").fetchall()
+        except sqlite3.Error:
+            rows = []
+        entries = dict(rows)
+
+        with self._stats_lock:
+            stats = {namespace: dict(counts) for namespace, counts in self._stats.items()}
+        for namespace, counts in stats.items():
+            counts['entries'] = entries.get(namespace, 0)
+
+        return {
+            'namespaces': stats,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'size_bytes': os.path.getsize(self.path) if self.path.exists() else 0
+        }
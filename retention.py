@@ -0,0 +1,170 @@
+"""
+Upload Retention for Brisbane Business Bridge AI
+Background sweeper that expires old uploads and results and enforces a disk quota
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Partial files left by interrupted atomic writes
+TEMP_SUFFIX = '.tmp'
+
+# Younger temp files may still be being written by another worker
+TEMP_GRACE_SECONDS = 300
+
+
+class RetentionSweeper:
+    """
+    Keeps a directory of uploads and result files within age and size limits
+
+    Each sweep deletes files older than max_age_seconds, then deletes the
+    oldest remaining files until the directory fits in max_bytes. Sweeps run
+    every interval seconds on a daemon thread, and early when writers report
+    (via note_written) that the quota has probably been exceeded. Several
+    workers may sweep the same directory; a file another worker already
+    removed is simply skipped.
+    """
+
+    def __init__(self, directory, max_age_seconds=72 * 3600, max_bytes=500 * 1024 * 1024, interval=600.0):
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Estimated directory size between sweeps
+        self._bytes_estimate = 0
+        self.stats = {
+            'sweeps': 0,
+            'files_removed': 0,
+            'bytes_reclaimed': 0,
+            'expired_files': 0,
+            'quota_evictions': 0,
+            'temp_files_removed': 0,
+            'last_sweep': None,
+            'files': 0,
+            'bytes': 0
+        }
+
+    def _scan(self):
+        """List (mtime, size, path) for every regular, non-hidden file in the directory"""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.startswith('.'):
+                        continue  # e.g. .gitkeep
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"[WARNING] Could not remove {path}: {e}")
+            return False
+
+    def sweep(self, compact=False):
+        """
+        Expire old files and enforce the quota; returns bytes reclaimed
+
+        With compact=True, leftover temp files from interrupted writes are
+        removed once they are TEMP_GRACE_SECONDS old (used once at startup).
+        """
+        with self._lock:
+            now = time.time()
+            entries = sorted(self._scan())
+            kept = []
+            removed = {'expired_files': 0, 'quota_evictions': 0, 'temp_files_removed': 0}
+            reclaimed = 0
+
+            for mtime, size, path in entries:
+                if compact and path.endswith(TEMP_SUFFIX) and now - mtime > TEMP_GRACE_SECONDS:
+                    reason = 'temp_files_removed'
+                elif self.max_age_seconds and now - mtime > self.max_age_seconds:
+                    reason = 'expired_files'
+                else:
+                    kept.append((mtime, size, path))
+                    continue
+                if self._remove(path):
+                    removed[reason] += 1
+                    reclaimed += size
+
+            # Oldest first until the directory fits the quota
+            total = sum(size for _, size, _ in kept)
+            if self.max_bytes:
+                while kept and total > self.max_bytes:
+                    _, size, path = kept.pop(0)
+                    total -= size
+                    if self._remove(path):
+                        removed['quota_evictions'] += 1
+                        reclaimed += size
+
+            self._bytes_estimate = total
+            self.stats['sweeps'] += 1
+            self.stats['files_removed'] += sum(removed.values())
+            self.stats['bytes_reclaimed'] += reclaimed
+            for reason, count in removed.items():
+                self.stats[reason] += count
+            self.stats['last_sweep'] = datetime.now().isoformat()
+            self.stats['files'] = len(kept)
+            self.stats['bytes'] = total
+
+        if reclaimed:
+            print(f"[RETENTION] Removed {sum(removed.values())} files, reclaimed {reclaimed / 1024 / 1024:.1f} MB")
+        return reclaimed
+
+    def note_written(self, nbytes):
+        """Record a new file; wakes the sweeper early if the quota is likely exceeded"""
+        with self._lock:
+            self._bytes_estimate += nbytes
+            over_quota = self.max_bytes and self._bytes_estimate > self.max_bytes
+        if over_quota:
+            self._wake.set()
+
+    def start(self):
+        """Compact once, then sweep periodically on a daemon thread"""
+        if self._thread is not None:
+            return
+
+        def run():
+            self.sweep(compact=True)
+            while not self._stop.is_set():
+                self._wake.wait(self.interval or None)
+                self._wake.clear()
+                if self._stop.is_set():
+                    return
+                self.sweep()
+
+        self._thread = threading.Thread(target=run, name='upload-retention', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def status(self):
+        """Sweep counters and limits for monitoring"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['max_age_seconds'] = self.max_age_seconds
+        stats['max_bytes'] = self.max_bytes
+        return stats